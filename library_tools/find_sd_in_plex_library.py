@@ -16,6 +16,8 @@ Usage:
   python find_sd_in_plex_library.py "Movies"
   python find_sd_in_plex_library.py "TV Shows" --csv sd_tv.csv
   python find_sd_in_plex_library.py "Movies" --insecure
+  python find_sd_in_plex_library.py "Movies" --deep-probe
+  python find_sd_in_plex_library.py "TV Shows" --lean-xml
   python find_sd_in_plex_library.py "Movies" --paths-only
   python find_sd_in_plex_library.py "Movies" --delete
   python find_sd_in_plex_library.py "Movies" --delete-no-confirm
@@ -26,60 +28,128 @@ import sys
 import csv
 import argparse
 import logging
-from typing import Optional, List
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List
 
 from dotenv import load_dotenv
 from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from plexapi.server import PlexServer
 from plexapi.library import LibrarySection
 from plexapi.video import Movie, Episode
 
 # ------------------------------- helpers -------------------------------- #
 
+# Plex videoResolution labels mapped to pixel heights
+_RES_MAP: Dict[str, int] = {
+    "4k": 2160, "uhd": 2160, "2160": 2160, "2160p": 2160,
+    "1080": 1080, "1080p": 1080, "fhd": 1080,
+    "720": 720, "720p": 720, "hd": 720,
+    "576": 576, "576p": 576,
+    "480": 480, "480p": 480, "sd": 480,
+}
+
+
 def res_to_height(res: Optional[str]) -> Optional[int]:
     """Convert Plex videoResolution to a numeric height when possible."""
     if not res:
         return None
     s = str(res).lower()
-    mapping = {
-        "4k": 2160, "uhd": 2160, "2160": 2160, "2160p": 2160,
-        "1080": 1080, "1080p": 1080, "fhd": 1080,
-        "720": 720, "720p": 720, "hd": 720,
-        "576": 576, "576p": 576,
-        "480": 480, "480p": 480, "sd": 480,
-    }
-    if s in mapping:
-        return mapping[s]
+    h = _RES_MAP.get(s)
+    if h is not None:
+        return h
     try:
         return int(s)
-    except Exception:
+    except ValueError:
         return None
 
 
-def item_max_height(item) -> Optional[int]:
-    """Return the maximum height across all media versions for a movie or episode."""
+# Query params for --lean-xml. The scan reads only titles, indexes, Media and Part,
+# so Plex can leave out the long text fields and tag elements from every response.
+_LEAN_XML_PARAMS = {
+    "excludeFields": "summary,tagline",
+    "excludeElements": "Genre,Country,Guid,Rating,Collection,Director,Writer,Role,Producer,Similar,Label",
+}
+
+
+# Include flags for the one stream-level reload. Only Media/Part/Stream data is
+# needed, so every optional block Plex would normally attach is turned off.
+_LEAN_RELOAD = {
+    "checkFiles": False,
+    "includeBandwidths": False,
+    "includeChapters": False,
+    "includeChildren": False,
+    "includeExternalMedia": False,
+    "includeExtras": False,
+    "includeFields": False,
+    "includeGeolocation": False,
+    "includeLoudnessRamps": False,
+    "includeMarkers": False,
+    "includeOnDeck": False,
+}
+
+
+def _media_height(m) -> Optional[int]:
+    """Height of a single media version from Media.height or Media.videoResolution."""
+    h = None
+    if getattr(m, "height", None):
+        try:
+            h = int(m.height)
+        except Exception:
+            h = None
+    if not h:
+        h = res_to_height(getattr(m, "videoResolution", None))
+    return h
+
+
+def _stream_heights(item) -> List[int]:
+    """
+    Return video stream heights for all parts of an item.
+    Listing results carry no streams, so the item is reloaded once with lean include flags.
+    """
+    def parts():
+        return [p for m in getattr(item, "media", []) or [] for p in getattr(m, "parts", []) or []]
+
+    found = parts()
+    if not any(getattr(p, "streams", None) for p in found):
+        try:
+            item.reload(**_LEAN_RELOAD)
+        except Exception:
+            return []
+        found = parts()
+    heights: List[int] = []
+    for p in found:
+        for s in getattr(p, "streams", []) or []:
+            if getattr(s, "streamType", None) == 1 and getattr(s, "height", None):
+                heights.append(int(s.height))
+    return heights
+
+
+def item_max_height(item, hd_threshold: Optional[int] = None, deep: bool = False) -> Optional[int]:
+    """
+    Return the maximum height across all media versions for a movie or episode.
+    With hd_threshold set, return the first height at or above it without looking further,
+    since the item is already known not to be SD.
+    With deep set, fall back to video stream heights when no media version reports a height.
+    """
     heights: List[int] = []
     try:
+        needs_streams = False
         for m in getattr(item, "media", []) or []:
-            h = None
-            if getattr(m, "height", None):
-                try:
-                    h = int(m.height)
-                except Exception:
-                    h = None
-            if not h:
-                vr = getattr(m, "videoResolution", None)
-                h = res_to_height(vr)
-            if not h:
-                try:
-                    for p in getattr(m, "parts", []) or []:
-                        for s in getattr(p, "streams", []) or []:
-                            if getattr(s, "streamType", None) == 1 and getattr(s, "height", None):
-                                h = max(h or 0, int(s.height))
-                except Exception:
-                    pass
+            h = _media_height(m)
+            if h and hd_threshold is not None and h >= hd_threshold:
+                return h
             if h:
                 heights.append(h)
+            else:
+                needs_streams = True
+        if deep and needs_streams and not heights:
+            try:
+                heights.extend(_stream_heights(item))
+            except Exception:
+                pass
     except Exception:
         return None
     if not heights:
@@ -109,12 +179,32 @@ def get_item_paths(item) -> List[str]:
     return paths
 
 
+def _safe_episodes(show, log: logging.Logger) -> list:
+    """Return the episodes of a show, or an empty list if Plex refuses."""
+    try:
+        return show.episodes()
+    except Exception as e:
+        log.warning("Could not list episodes for show %s: %s", getattr(show, "title", show), e)
+        return []
+
+
+def iter_show_episodes(shows, log: logging.Logger, max_workers: int = 16):
+    """
+    Yield episodes for each show, fetching shows concurrently over the pooled session.
+    Show order is preserved.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        for episodes in ex.map(lambda s: _safe_episodes(s, log), shows):
+            yield from episodes
+
+
 # ------------------------------- core ----------------------------------- #
 
-def find_sd_items(section: LibrarySection, min_hd_height: int = 720, log: logging.Logger = None):
+def find_sd_items(section: LibrarySection, min_hd_height: int = 720, log: logging.Logger = None, deep: bool = False):
     """
     Yield dictionaries describing SD items in the given library section.
     An item qualifies as SD if its maximum height is strictly below min_hd_height.
+    Set deep to probe video streams for items whose media carries no height.
     """
     if log is None:
         log = logging.getLogger(__name__)
@@ -122,9 +212,10 @@ def find_sd_items(section: LibrarySection, min_hd_height: int = 720, log: loggin
     if section.type == "movie":
         items = section.all()
         for mv in items:
-            mh = item_max_height(mv)
+            mh = item_max_height(mv, min_hd_height, deep=deep)
             if mh is None:
-                log.debug("No height info for movie: %s", mv.title)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("No height info for movie: %s", mv.title)
                 continue
             if mh < min_hd_height:
                 yield {
@@ -143,33 +234,47 @@ def find_sd_items(section: LibrarySection, min_hd_height: int = 720, log: loggin
                 }
 
     elif section.type == "show":
-        shows = section.all()
-        for show in shows:
-            try:
-                episodes = show.episodes()
-            except Exception as e:
-                log.warning("Could not list episodes for show %s: %s", show.title, e)
-                continue
-            for ep in episodes:
-                mh = item_max_height(ep)
-                if mh is None:
+        # One paginated episode search for the whole library instead of a
+        # show.episodes() round trip per show. Show years come from the show
+        # listing since episodes do not always carry grandparentYear.
+        shows = []
+        show_years = {}
+        try:
+            shows = section.all()
+            for show in shows:
+                show_years[getattr(show, "ratingKey", None)] = getattr(show, "year", "")
+        except Exception as e:
+            log.warning("Could not list shows for library %s: %s", section.title, e)
+        try:
+            episodes = section.search(libtype="episode", container_size=500)
+        except Exception as e:
+            # Older servers may reject the episode search, fall back to per-show listing
+            log.warning("Episode search failed for library %s, listing per show: %s", section.title, e)
+            episodes = iter_show_episodes(shows, log)
+        for ep in episodes:
+            mh = item_max_height(ep, min_hd_height, deep=deep)
+            if mh is None:
+                # describe_episode may call ep.season(), so only build it when debug is on
+                if log.isEnabledFor(logging.DEBUG):
                     log.debug("No height info for episode: %s", describe_episode(ep))
-                    continue
-                if mh < min_hd_height:
-                    yield {
-                        "library": section.title,
-                        "type": "episode",
-                        "title": show.title,
-                        "year": getattr(show, "year", ""),
-                        "show_title": show.title,
-                        "season": getattr(ep, "seasonNumber", ""),
-                        "episode": getattr(ep, "index", ""),
-                        "episode_title": getattr(ep, "title", ""),
-                        "max_height": mh,
-                        "ratingKey": getattr(ep, "ratingKey", ""),
-                        "key": getattr(ep, "key", ""),
-                        "paths": get_item_paths(ep),
-                    }
+                continue
+            if mh < min_hd_height:
+                show_title = getattr(ep, "grandparentTitle", "")
+                show_year = getattr(ep, "grandparentYear", None) or show_years.get(getattr(ep, "grandparentRatingKey", None), "")
+                yield {
+                    "library": section.title,
+                    "type": "episode",
+                    "title": show_title,
+                    "year": show_year,
+                    "show_title": show_title,
+                    "season": getattr(ep, "seasonNumber", ""),
+                    "episode": getattr(ep, "index", ""),
+                    "episode_title": getattr(ep, "title", ""),
+                    "max_height": mh,
+                    "ratingKey": getattr(ep, "ratingKey", ""),
+                    "key": getattr(ep, "key", ""),
+                    "paths": get_item_paths(ep),
+                }
     else:
         log.warning("Library type %s is not supported for SD scan", section.type)
 
@@ -187,27 +292,39 @@ def delete_paths(paths: List[str], no_confirm: bool, log: logging.Logger) -> int
     """
     Delete each file path. Returns count of successful deletions.
     Paths should be absolute and visible from this host.
+    Paths are grouped by folder so existence is checked with one directory listing per folder.
     """
-    deleted = 0
+    groups: Dict[str, List[str]] = defaultdict(list)
     for p in paths:
         if not p:
             continue
         if not os.path.isabs(p):
             log.warning("Skipping non absolute path: %s", p)
             continue
-        if not no_confirm:
-            if not confirm(f"Delete file: {p}"):
-                log.info("Skipped %s", p)
-                continue
+        groups[os.path.dirname(p)].append(p)
+
+    deleted = 0
+    for folder, group in groups.items():
         try:
-            if not os.path.exists(p):
-                log.warning("File does not exist: %s", p)
-                continue
-            os.remove(p)
-            deleted += 1
-            print(f"Deleted: {p}")
-        except Exception as e:
-            log.error("Failed to delete %s: %s", p, e)
+            with os.scandir(folder) as it:
+                existing = {e.name for e in it}
+        except OSError:
+            existing = set()
+        for p in group:
+            if not no_confirm:
+                if not confirm(f"Delete file: {p}"):
+                    log.info("Skipped %s", p)
+                    continue
+            try:
+                # Fall back to a stat on a miss, names may differ in case on some filesystems
+                if os.path.basename(p) not in existing and not os.path.exists(p):
+                    log.warning("File does not exist: %s", p)
+                    continue
+                os.remove(p)
+                deleted += 1
+                print(f"Deleted: {p}")
+            except Exception as e:
+                log.error("Failed to delete %s: %s", p, e)
     return deleted
 
 
@@ -221,6 +338,10 @@ def main():
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
     parser.add_argument("--threshold", type=int, default=720,
                         help="Height threshold for HD. Items with max height below this are treated as SD. Default 720")
+    parser.add_argument("--deep-probe", action="store_true",
+                        help="Reload items without a media height to read video stream heights. Slower, one extra request per such item.")
+    parser.add_argument("--lean-xml", action="store_true",
+                        help="Ask Plex to omit summaries and tag elements from responses to cut download and XML parse time.")
     parser.add_argument("--paths-only", action="store_true",
                         help="Only output absolute file paths for SD results, one per line. If --csv is set, write a one-column CSV with header 'path'.")
     parser.add_argument("--delete", action="store_true",
@@ -230,7 +351,7 @@ def main():
     args = parser.parse_args()
 
     # Logging: quiet when paths only or deleting, unless debug
-    quiet_default = args.paths_only or args.delete or args["delete_no_confirm"] if isinstance(args, dict) else (args.paths_only or args.delete or args.delete_no_confirm)
+    quiet_default = args.paths_only or args.delete or args.delete_no_confirm
     logging.basicConfig(
         level=logging.DEBUG if args.debug else (logging.WARNING if quiet_default else logging.INFO),
         format="%(levelname)s: %(message)s",
@@ -246,8 +367,18 @@ def main():
         log.error("Missing PLEX_URL or PLEX_API_TOKEN in environment. Create a .env file or export vars.")
         sys.exit(1)
 
-    # Build session with optional insecure mode
+    # Build a pooled keep-alive session with retries, plus optional insecure mode
     session = Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    if args.lean_xml:
+        session.params = dict(_LEAN_XML_PARAMS)
     if args.insecure:
         session.verify = False
         try:
@@ -277,43 +408,36 @@ def main():
     if not quiet_default:
         log.info("Scanning library %s (%s) for SD videos", section.title, section.type)
 
-    rows = list(find_sd_items(section, min_hd_height=args.threshold, log=log))
-
-    # Build a unique, deterministic list of absolute file paths
-    seen = set()
-    out_paths: List[str] = []
-    for r in rows:
-        for p in r.get("paths", []):
-            if p and p not in seen:
-                seen.add(p)
-                out_paths.append(p)
-
-    # Deletion flow
-    if args.delete or args.delete_no_confirm:
-        if not out_paths:
-            log.info("No SD file paths found to delete.")
+    results = find_sd_items(section, min_hd_height=args.threshold, log=log, deep=args.deep_probe)
+
+    if args.delete or args.delete_no_confirm or args.paths_only:
+        # Build a unique, deterministic list of absolute file paths. Only paths are kept.
+        out_paths: List[str] = list(dict.fromkeys(p for r in results for p in r.get("paths", []) if p))
+
+        # Deletion flow
+        if args.delete or args.delete_no_confirm:
+            if not out_paths:
+                log.info("No SD file paths found to delete.")
+                return
+            if args.delete_no_confirm:
+                print("Deleting files without confirmation. Use with care.")
+            deleted = delete_paths(out_paths, no_confirm=args.delete_no_confirm, log=log)
+            print(f"Deleted {deleted} of {len(out_paths)} file(s).")
+            # Optional CSV in delete mode, write list of attempted paths and status simple
+            if args.csv:
+                try:
+                    with open(args.csv, "w", newline="", encoding="utf-8") as f:
+                        w = csv.writer(f)
+                        w.writerow(["path"])
+                        w.writerows([p] for p in out_paths)
+                    log.info("Wrote CSV of targeted paths to %s", args.csv)
+                except Exception as e:
+                    log.error("Failed to write CSV %s: %s", args.csv, e)
+                    sys.exit(4)
+            # Tip: you can trigger a library scan in Plex manually after deletions
             return
-        if args.delete_no_confirm:
-            print("Deleting files without confirmation. Use with care.")
-        deleted = delete_paths(out_paths, no_confirm=args.delete_no_confirm, log=log)
-        print(f"Deleted {deleted} of {len(out_paths)} file(s).")
-        # Optional CSV in delete mode, write list of attempted paths and status simple
-        if args.csv:
-            try:
-                with open(args.csv, "w", newline="", encoding="utf-8") as f:
-                    w = csv.writer(f)
-                    w.writerow(["path"])
-                    for p in out_paths:
-                        w.writerow([p])
-                log.info("Wrote CSV of targeted paths to %s", args.csv)
-            except Exception as e:
-                log.error("Failed to write CSV %s: %s", args.csv, e)
-                sys.exit(4)
-        # Tip: you can trigger a library scan in Plex manually after deletions
-        return
 
-    # Paths only flow
-    if args.paths_only:
+        # Paths only flow
         for p in out_paths:
             print(p)
         if args.csv:
@@ -321,30 +445,15 @@ def main():
                 with open(args.csv, "w", newline="", encoding="utf-8") as f:
                     w = csv.writer(f)
                     w.writerow(["path"])
-                    for p in out_paths:
-                        w.writerow([p])
+                    w.writerows([p] for p in out_paths)
             except Exception as e:
                 log.error("Failed to write CSV %s: %s", args.csv, e)
                 sys.exit(4)
         return
 
-    # Normal verbose output
-    count = len(rows)
-    if count == 0:
-        log.info("No SD items found.")
-        return
-
-    for r in rows:
-        if r["type"] == "movie":
-            print(f"[MOVIE] {r['title']} ({r['year']}) - max height {r['max_height']} - ratingKey {r['ratingKey']}")
-        else:
-            s = r.get("season", "")
-            e = r.get("episode", "")
-            ep_label = f"S{int(s):02d}E{int(e):02d}" if s and e else ""
-            print(f"[EPISODE] {r['show_title']} {ep_label} - {r['episode_title']} - max height {r['max_height']} - ratingKey {r['ratingKey']}")
-
-    log.info("Found %d SD items", count)
-
+    # Normal verbose output, streamed: each row is printed and written to CSV as it is found
+    f = None
+    writer = None
     if args.csv:
         fieldnames = [
             "library", "type", "title", "year",
@@ -352,15 +461,41 @@ def main():
             "max_height", "ratingKey", "key",
         ]
         try:
-            with open(args.csv, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(rows)
-            log.info("Wrote CSV to %s", args.csv)
+            f = open(args.csv, "w", newline="", encoding="utf-8")
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+            writer.writeheader()
         except Exception as e:
             log.error("Failed to write CSV %s: %s", args.csv, e)
             sys.exit(4)
 
+    count = 0
+    try:
+        for r in results:
+            count += 1
+            if r["type"] == "movie":
+                print(f"[MOVIE] {r['title']} ({r['year']}) - max height {r['max_height']} - ratingKey {r['ratingKey']}")
+            else:
+                s = r.get("season", "")
+                e = r.get("episode", "")
+                ep_label = f"S{int(s):02d}E{int(e):02d}" if s and e else ""
+                print(f"[EPISODE] {r['show_title']} {ep_label} - {r['episode_title']} - max height {r['max_height']} - ratingKey {r['ratingKey']}")
+            if writer is not None:
+                try:
+                    writer.writerow(r)
+                except Exception as e:
+                    log.error("Failed to write CSV %s: %s", args.csv, e)
+                    sys.exit(4)
+    finally:
+        if f is not None:
+            f.close()
+
+    if count == 0:
+        log.info("No SD items found.")
+        return
+
+    log.info("Found %d SD items", count)
+    if args.csv:
+        log.info("Wrote CSV to %s", args.csv)
 
 if __name__ == "__main__":
     main()
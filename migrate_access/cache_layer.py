@@ -0,0 +1,66 @@
+"""
+Small on-disk JSON cache for values that are slow to fetch from Plex.
+
+Entries live under ~/.cache/plex_tools/ (override with PLEX_TOOLS_CACHE_DIR), one file per key,
+and expire after the TTL given by the caller. Values must be JSON serializable.
+A cache that cannot be read or written is ignored and the value is fetched as usual.
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Any, Callable, Optional
+
+CACHE_DIR = os.getenv("PLEX_TOOLS_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "plex_tools")
+
+
+def _path_for(key: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9._-]+", "_", key)
+    return os.path.join(CACHE_DIR, f"{safe}.json")
+
+
+def get_or_fetch(key: str, ttl: float, fetcher: Callable[[], Any], valid: Optional[Callable[[Any], bool]] = None) -> Any:
+    """
+    Return the cached value for key if it is younger than ttl seconds, and accepted by valid
+    when given, otherwise call fetcher, store its result in place of the old one, and return it.
+    """
+    path = _path_for(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        if time.time() - entry["stored_at"] < ttl and (valid is None or valid(entry["value"])):
+            return entry["value"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    value = fetcher()
+    put(key, value)
+    return value
+
+
+def put(key: str, value: Any) -> None:
+    """Store value for key, replacing any cached value. A failed write is ignored."""
+    path = _path_for(key)
+    tmp = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"stored_at": time.time(), "value": value}, f)
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError):
+        if tmp and os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+def forget(key: str) -> None:
+    """Drop the cached value for key, if any."""
+    try:
+        os.remove(_path_for(key))
+    except OSError:
+        pass
@@ -24,11 +24,25 @@ import argparse
 import os
 import sys
 import getpass
-from typing import Dict, List, Set, Tuple, Optional
+import inspect
+import itertools
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Set, Tuple, Optional
 
 from dotenv import load_dotenv
-from plexapi.myplex import MyPlexAccount
+from requests import RequestException, Session
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as UrllibHTTPError
+from urllib3.util.retry import Retry
+from plexapi.myplex import MyPlexAccount, MyPlexUser
 from plexapi.server import PlexServer
+
+import cache_layer
+
 try:
     from plexapi.exceptions import Unauthorized, BadRequest
 except Exception:  # pragma: no cover
@@ -36,45 +50,74 @@ except Exception:  # pragma: no cover
     BadRequest = Exception
 
 
-def _try_create_account(username: str, password: str, code: Optional[str]) -> MyPlexAccount:
+def _detect_mfa_kw() -> Optional[str]:
+    """Name of the MyPlexAccount keyword that takes a 2FA code in this plexapi version, if any."""
+    try:
+        params = inspect.signature(MyPlexAccount.__init__).parameters
+    except (TypeError, ValueError):
+        return None
+    for name in ("code", "twoFactorCode"):
+        if name in params:
+            return name
+    return None
+
+
+# Resolved once at import, so sign in does not probe constructor signatures on every attempt
+_MFA_KW = _detect_mfa_kw()
+
+
+def build_session() -> Session:
+    """
+    One pooled keep-alive session with retries, shared by plex.tv and both servers.
+    Resources connect through the account's session, so passing it to MyPlexAccount covers every request.
+    Only reads are retried: urllib3 would otherwise repeat the PUT behind updateFriend too.
+    Once retries run out the last response is returned, so plexapi raises its usual errors.
     """
-    Try different constructor signatures for MyPlexAccount to support a range of plexapi versions.
+    session = Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _try_create_account(username: str, password: str, code: Optional[str], session: Optional[Session] = None) -> MyPlexAccount:
+    """
+    Create a MyPlexAccount, passing the 2FA code with whichever keyword this plexapi version supports.
     """
     if code:
-        # First try with 'code='
+        if _MFA_KW:
+            return MyPlexAccount(username, password, session=session, **{_MFA_KW: code})
+        # Very old versions without a keyword, try positional with code as 3rd arg
         try:
-            return MyPlexAccount(username, password, code=code)
-        except TypeError:
-            pass
-        # Then try with 'twoFactorCode='
-        try:
-            return MyPlexAccount(username, password, twoFactorCode=code)
-        except TypeError:
-            pass
-        # Last, try positional with code as 3rd arg
-        try:
-            return MyPlexAccount(username, password, code)
+            return MyPlexAccount(username, password, code, session=session)
         except TypeError:
             pass
     # Final attempt without code
-    return MyPlexAccount(username, password)
+    return MyPlexAccount(username, password, session=session)
 
 
-def load_account(args) -> MyPlexAccount:
+def load_account(args, session: Optional[Session] = None) -> MyPlexAccount:
     token = os.getenv("PLEX_ACCOUNT_TOKEN")
     user = os.getenv("PLEX_USERNAME")
     pwd = os.getenv("PLEX_PASSWORD")
     preset_code = args.mfa_code or os.getenv("PLEX_2FA_CODE")
 
     if token:
-        return MyPlexAccount(token=token)
+        return MyPlexAccount(token=token, session=session)
 
     if not user or not pwd:
         raise RuntimeError("Missing credentials. Set PLEX_ACCOUNT_TOKEN or PLEX_USERNAME and PLEX_PASSWORD in .env.")
 
     # First attempt without MFA code unless one was supplied
     try:
-        return _try_create_account(user, pwd, preset_code)
+        return _try_create_account(user, pwd, preset_code, session)
     except Unauthorized as e:
         # If Unauthorized and no code was provided, try prompting for MFA code
         msg = str(e).lower()
@@ -94,7 +137,7 @@ def load_account(args) -> MyPlexAccount:
                 print("Empty code, try again.")
                 continue
             try:
-                return _try_create_account(user, pwd, code)
+                return _try_create_account(user, pwd, code, session)
             except Unauthorized as e2:
                 print("Invalid or expired code. Trying again.")
                 last_err = e2
@@ -114,45 +157,184 @@ def load_account(args) -> MyPlexAccount:
                 print("Empty code, try again.")
                 continue
             try:
-                return _try_create_account(user, pwd, code)
+                return _try_create_account(user, pwd, code, session)
             except Exception:
                 print("Invalid or expired code. Trying again.")
                 continue
         raise RuntimeError("Failed to authenticate after 3 MFA attempts.")
 
 
-def connect_server_by_name(account: MyPlexAccount, server_name: str) -> PlexServer:
+def _discover_server(account: MyPlexAccount, server_name: str) -> PlexServer:
     res = account.resource(server_name)
     if res is None:
         raise RuntimeError(f"Could not find server resource named '{server_name}' under this Plex account.")
     try:
+        # plexapi tries local connections before remote and relay ones
         return res.connect()
     except Exception as e:
         raise RuntimeError(f"Failed to connect to server '{server_name}': {e}")
 
 
-def sections_by_title(server: PlexServer) -> Dict[str, object]:
+# Seconds to wait on a cached server address before falling back to discovery
+_PROBE_TIMEOUT = 5
+
+
+def _probe_server(baseurl: str, token: str, server_name: str) -> bool:
     """
-    Return a dict mapping casefolded library title to the Section object.
+    Check that baseurl answers quickly as server_name. Uses a plain session, without the
+    account session's retries, so a stale address fails fast.
+    """
+    try:
+        with Session() as probe:
+            resp = probe.get(baseurl, headers={"X-Plex-Token": token}, timeout=_PROBE_TIMEOUT)
+        if resp.status_code != 200:
+            return False
+        info = ET.fromstring(resp.content).attrib
+    except (RequestException, ET.ParseError):
+        return False
+    name = server_name.lower()
+    return (info.get("friendlyName") or "").lower() == name or info.get("machineIdentifier") == server_name
+
+
+def connect_server_by_name(account: MyPlexAccount, server_name: str, cache_ttl: float = 0) -> PlexServer:
+    """
+    Resolve the server through the account's resources and connect to it.
+    With cache_ttl above zero the chosen base URL is cached on disk, and a warm run connects to it
+    directly with the account token, skipping resource discovery. A cached URL that does not answer
+    within a few seconds, or answers as another server, is dropped and discovery runs again.
+    """
+    if cache_ttl <= 0:
+        return _discover_server(account, server_name)
+
+    connected: List[PlexServer] = []
+
+    def discover() -> str:
+        connected.append(_discover_server(account, server_name))
+        return connected[0]._baseurl
+
+    key = f"server-{server_name}"
+    baseurl = cache_layer.get_or_fetch(key, cache_ttl, discover)
+    if connected:
+        return connected[0]
+    if _probe_server(baseurl, account.authenticationToken, server_name):
+        try:
+            return PlexServer(baseurl, account.authenticationToken, session=account._session)
+        except Exception:
+            pass
+    # Discover once and overwrite the entry, rather than retrying through the cache,
+    # which would keep returning the dead URL if the old file cannot be removed
+    cache_layer.forget(key)
+    server = _discover_server(account, server_name)
+    cache_layer.put(key, server._baseurl)
+    return server
+
+
+@dataclass
+class SectionSnapshot:
+    """
+    One pass over a server's library sections.
+    by_title_cf maps the casefolded title to (display title, section), where the section is a
+    Section object, or the plain library name when loaded from the on-disk cache; updateFriend
+    accepts either.
+    Titles and keys are interned so every user's title sets share the same string objects.
+    """
+    by_title_cf: Dict[str, Tuple[str, object]]
+    titles: FrozenSet[str]
+
+
+def snapshot_sections(server: PlexServer, cache_ttl: float = 0) -> SectionSnapshot:
+    """
+    Fetch the server's sections once and return them along with a dict mapping
+    casefolded library title to (display title, Section) and the set of display titles.
+    With cache_ttl above zero, library names are cached on disk per server along with the
+    server's updatedAt, so a warm run skips the sections request while that is unchanged.
     Warn if duplicates by title exist.
     """
-    by_title = {}
+    if cache_ttl > 0:
+        fetched: List[object] = []
+
+        stamp = int(server.updatedAt.timestamp()) if getattr(server, "updatedAt", None) else 0
+
+        def fetch() -> Dict[str, object]:
+            fetched.extend(server.library.sections())
+            return {"stamp": stamp, "names": [sec.title for sec in fetched]}
+
+        def current(value) -> bool:
+            return isinstance(value, dict) and value.get("stamp") == stamp
+
+        # One file per server, replaced when the server's libraries change
+        cached = cache_layer.get_or_fetch(f"sections-{server.machineIdentifier}", cache_ttl, fetch, valid=current)
+        entries = fetched or cached["names"]
+    else:
+        entries = server.library.sections()
+
+    by_title_cf: Dict[str, Tuple[str, object]] = {}
+    titles: Set[str] = set()
     dupes = set()
-    for sec in server.library.sections():
-        key = sec.title.casefold()
-        if key in by_title:
-            dupes.add(sec.title)
-        by_title[key] = sec
+    for sec in entries:
+        title = sys.intern(sec if isinstance(sec, str) else sec.title)
+        key = sys.intern(title.casefold())
+        if key in by_title_cf:
+            dupes.add(title)
+        by_title_cf[key] = (title, sec)
+        titles.add(title)
+    snap = SectionSnapshot(by_title_cf=by_title_cf, titles=frozenset(titles))
     if dupes:
         print(f"[WARN] Server '{server.friendlyName}' has duplicate library names detected: {sorted(dupes)}")
-    return by_title
+    return snap
+
+
+# Per-run memo of share lookups, keyed by (user key, server machineIdentifier).
+# Each user is read on the source and again on the destination, and plexapi may
+# hit the network for both the share and its sections.
+_share_cache: Dict[Tuple[object, str], object] = {}
+_titles_cache: Dict[Tuple[object, str], Set[str]] = {}
+
+
+def _user_key(friend) -> object:
+    """Stable cache key for a user object, its Plex id when available."""
+    return getattr(friend, "id", None) or id(friend)
+
+
+_label_cache: Dict[object, str] = {}
+
+
+def _label(friend) -> str:
+    """Display name for a user, title then username, resolved once per user."""
+    key = _user_key(friend)
+    label = _label_cache.get(key)
+    if label is None:
+        label = getattr(friend, "title", None) or getattr(friend, "username", None) or str(friend)
+        _label_cache[key] = label
+    return label
+
+
+def _forget_user_on_server(friend, server: PlexServer) -> None:
+    """Drop cached share data for this user on server, for use after a share update."""
+    key = (_user_key(friend), server.machineIdentifier)
+    _share_cache.pop(key, None)
+    _titles_cache.pop(key, None)
+
+
+def _release_user(friend, servers: Iterable[PlexServer], shares_index: Optional[Dict[object, Dict[str, object]]]) -> None:
+    """Drop everything memoized for this user once it is planned, so memory does not grow with the account."""
+    key = _user_key(friend)
+    for server in servers:
+        _forget_user_on_server(friend, server)
+    _label_cache.pop(key, None)
+    if shares_index is not None:
+        shares_index.pop(key, None)
 
 
 def _share_for_user_on_server(friend, server_machine_id: str, server_name: str):
     """
     Return the MyPlexServerShare object for this user on the given server, or None.
     Works across plexapi versions that expose .server(name) and/or .servers lists.
+    Results are memoized per user and server.
     """
+    key = (_user_key(friend), server_machine_id)
+    if key in _share_cache:
+        return _share_cache[key]
     share = None
     # Preferred: use the helper that resolves by name
     if hasattr(friend, "server"):
@@ -168,24 +350,138 @@ def _share_for_user_on_server(friend, server_machine_id: str, server_name: str):
             if mid == server_machine_id or nm == server_name:
                 share = s
                 break
+    _share_cache[key] = share
     return share
 
 
+def stream_users(account: MyPlexAccount) -> Iterator[object]:
+    """
+    Yield the account's users while the plex.tv users document is parsed, instead of building the full list first.
+    The request is made before returning so auth and network errors surface at the call site.
+    Falls back to account.users() when the response cannot be streamed.
+    """
+    url = MyPlexUser.key
+    try:
+        resp = account._session.get(url, headers=account._headers(), timeout=account._timeout, stream=True)
+    except AttributeError:
+        return iter(account.users())
+    if resp.status_code != 200:
+        # Let plexapi make the request again and raise its usual error
+        resp.close()
+        return iter(account.users())
+    resp.raw.decode_content = True
+    return _iter_users(account, resp, url)
+
+
+def _iter_users(account: MyPlexAccount, resp, url: str) -> Iterator[object]:
+    root = None
+    try:
+        for event, elem in ET.iterparse(resp.raw, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+            if elem.tag == MyPlexUser.TAG:
+                yield MyPlexUser(account, elem, url)
+                # The user object keeps its own element, drop the container's reference to it
+                root.clear()
+    except (ET.ParseError, RequestException, UrllibHTTPError) as e:
+        # A truncated or dropped response is only noticed part way through the users
+        print(f"ERROR: Could not retrieve account users: {e}")
+        sys.exit(1)
+    finally:
+        resp.close()
+
+
+def index_user_shares(users: Iterable[object], index: Dict[object, Dict[str, object]]) -> Iterator[object]:
+    """
+    Record each user's server shares in index as the users stream past, then yield the user.
+    index becomes {user key: {server machineIdentifier: MyPlexServerShare}}.
+    The users listing already carries the shares, so no extra requests are made.
+    """
+    for u in users:
+        by_server: Dict[str, object] = {}
+        try:
+            for s in getattr(u, "servers", None) or []:
+                mid = getattr(s, "machineIdentifier", None)
+                if mid:
+                    by_server[mid] = s
+        except Exception:
+            pass
+        index[_user_key(u)] = by_server
+        yield u
+
+
+def fetch_all_shares(account: MyPlexAccount, server: PlexServer, all_titles: FrozenSet[str]) -> Dict[object, Set[str]]:
+    """
+    Read every user's shared library titles on server with a single plex.tv request.
+    Returns {user id: set of titles}. Only the server owner may read this, so callers
+    should fall back to per-user lookups on error.
+    """
+    url = f"https://plex.tv/api/servers/{server.machineIdentifier}/shared_servers"
+    data = account.query(url)
+    shares: Dict[object, Set[str]] = {}
+    for elem in data.iter("SharedServer"):
+        uid = elem.attrib.get("userID")
+        if not uid:
+            continue
+        if elem.attrib.get("allLibraries") == "1":
+            titles = set(all_titles)
+        else:
+            titles = {
+                sys.intern(sec.attrib["title"])
+                for sec in elem.iter("Section")
+                if sec.attrib.get("shared") == "1" and sec.attrib.get("title")
+            }
+        shares[int(uid) if uid.isdigit() else uid] = titles
+    return shares
+
+
+def prime_shares_from_server(account: MyPlexAccount, server: PlexServer, all_titles: FrozenSet[str], debug: bool) -> None:
+    """
+    Fill the share title cache for every user listed in the server's bulk share document,
+    so friend_shared_sections_titles needs no per-user request for them.
+    """
+    try:
+        shares = fetch_all_shares(account, server, all_titles)
+    except Exception as e:
+        if debug:
+            print(f"Bulk share read failed on '{server.friendlyName}', reading per user instead: {e}")
+        return
+    mid = server.machineIdentifier
+    for uid, titles in shares.items():
+        _titles_cache[(uid, mid)] = titles
+    if debug:
+        print(f"Read shares for {len(shares)} users on '{server.friendlyName}' in one request")
+
+
 def friend_shared_sections_titles(
     account: MyPlexAccount,
     friend,
     target_server: PlexServer,
+    shares_index: Optional[Dict[object, Dict[str, object]]] = None,
+    all_titles: Optional[FrozenSet[str]] = None,
 ) -> Set[str]:
     """
     For a given friend or managed user, return the set of section titles they have on target_server.
-    Honors 'allLibraries', otherwise enumerates share.sections().
+    Honors 'allLibraries' using all_titles (the server's precomputed library titles) when given,
+    otherwise enumerates share.sections().
+    The share is looked up in shares_index first, then resolved through the user object.
+    Results are memoized per user and server, callers get their own copy.
     """
+    key = (_user_key(friend), target_server.machineIdentifier)
+    cached = _titles_cache.get(key)
+    if cached is not None:
+        return set(cached)
+
     titles: Set[str] = set()
     server_name = target_server.friendlyName
     server_machine_id = target_server.machineIdentifier
 
     try:
-        share = _share_for_user_on_server(friend, server_machine_id, server_name)
+        share = (shares_index or {}).get(_user_key(friend), {}).get(server_machine_id)
+        if not share:
+            share = _share_for_user_on_server(friend, server_machine_id, server_name)
 
         # One more fallback through account.user(...) in case 'friend' is a lightweight object
         if not share and hasattr(account, "user"):
@@ -197,82 +493,268 @@ def friend_shared_sections_titles(
             except Exception:
                 pass
 
-        if not share:
-            return titles
-
-        # If the user is shared all libraries on this server, treat as all titles
-        if getattr(share, "allLibraries", False):
-            for sec in target_server.library.sections():
-                titles.add(sec.title)
-            return titles
-
-        # Otherwise enumerate the shared sections
-        try:
-            for sec in share.sections():
-                t = getattr(sec, "title", None)
-                if t:
-                    titles.add(t)
-        except Exception:
-            # Some plexapi versions may need a defensive retry, but usually .sections() is fine
-            return titles
+        if share:
+            # If the user is shared all libraries on this server, treat as all titles
+            if getattr(share, "allLibraries", False):
+                if all_titles is None:
+                    all_titles = {sec.title for sec in target_server.library.sections()}
+                titles.update(all_titles)
+            else:
+                # Otherwise enumerate the shared sections
+                try:
+                    for sec in share.sections():
+                        t = getattr(sec, "title", None)
+                        if t:
+                            titles.add(sys.intern(t))
+                except Exception:
+                    # Some plexapi versions may need a defensive retry, but usually .sections() is fine
+                    return titles
 
     except Exception as e:
-        friend_label = getattr(friend, "title", None) or getattr(friend, "username", None) or str(friend)
+        friend_label = _label(friend)
         print(f"[WARN] Could not read shared sections for user '{friend_label}' on '{server_name}': {e}")
+        return titles
 
-    return titles
+    _titles_cache[key] = titles
+    return set(titles)
 
 
-def ensure_union_share_on_destination(
+def read_user_shares(
     account: MyPlexAccount,
     friend,
+    src_server: PlexServer,
+    dest_server: PlexServer,
+    dest_title_to_section: Dict[str, Tuple[str, object]],
+    shares_index: Optional[Dict[object, Dict[str, object]]] = None,
+    src_all_titles: Optional[FrozenSet[str]] = None,
+    dest_all_titles: Optional[FrozenSet[str]] = None,
+    title_to_cf: Optional[Dict[str, str]] = None,
+) -> Tuple[object, Optional[Set[str]], Optional[Set[str]], Optional[Exception]]:
+    """
+    Read side work for one user, safe to run from worker threads.
+    Reads the user's source titles, and their destination titles when any source title exists there.
+    title_to_cf holds precomputed casefolded titles, so known titles are not casefolded per user.
+    Returns: (friend, src_titles, current_dest_titles, error)
+    """
+    try:
+        src_titles = friend_shared_sections_titles(account, friend, src_server, shares_index, src_all_titles)
+    except Exception as e:
+        return friend, None, None, e
+    current_titles = None
+    cf_get = (title_to_cf or {}).get
+    if any((cf_get(t) or t.casefold()) in dest_title_to_section for t in src_titles):
+        current_titles = friend_shared_sections_titles(account, friend, dest_server, shares_index, dest_all_titles)
+    return friend, src_titles, current_titles, None
+
+
+@dataclass
+class DestBits:
+    """
+    Bit positions for the destination libraries, so per-user title sets become int masks
+    and union or difference is a single | or & ~ on ints.
+    """
+    title_bit: Dict[str, int]
+    sections: List[object]
+    titles: List[str]
+
+
+def build_dest_bits(dest_snap: SectionSnapshot) -> DestBits:
+    """Assign each casefolded destination title a bit, in sorted order for stable output."""
+    bits = DestBits(title_bit={}, sections=[], titles=[])
+    for i, key in enumerate(sorted(dest_snap.by_title_cf)):
+        title, sec = dest_snap.by_title_cf[key]
+        bits.title_bit[key] = 1 << i
+        bits.sections.append(sec)
+        bits.titles.append(title)
+    return bits
+
+
+def titles_mask(titles, bits: DestBits, title_to_cf: Dict[str, str]) -> int:
+    """OR together the bits of the titles that exist on the destination."""
+    mask = 0
+    title_bit_get = bits.title_bit.get
+    cf_get = title_to_cf.get
+    for t in titles:
+        mask |= title_bit_get(cf_get(t) or t.casefold(), 0)
+    return mask
+
+
+def _mask_indexes(mask: int):
+    """Yield the positions of the set bits in mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+@dataclass
+class Plan:
+    """
+    A pending destination share update for one user.
+    The section list is built from final_mask only when the update is applied.
+    """
+    friend: object
+    added: List[str]
+    final_mask: int
+    bits: DestBits
+
+    @property
+    def final_sections(self) -> List[object]:
+        return [self.bits.sections[i] for i in _mask_indexes(self.final_mask)]
+
+
+def plan_union_share_on_destination(
+    friend,
+    desired_mask: int,
+    current_mask: int,
+    bits: DestBits,
+    skipped: Iterable[str] = (),
+) -> Optional[Plan]:
+    """
+    Compute union of current destination shares and desired libraries for one user, as bit masks.
+    current_mask is the user's destination titles as already read by the caller.
+    skipped lists the user's titles that do not exist on the destination, for the debug output.
+    Returns a Plan for the destination, or None if nothing would change.
+    """
+    to_add_mask = desired_mask & ~current_mask
+    if not to_add_mask:
+        return None
+
+    if skipped:
+        print(f"      Skipping titles not on dest: {sorted(skipped)}")
+
+    to_add = [bits.titles[i] for i in _mask_indexes(to_add_mask)]
+    print(f"    Will add on dest for user '{_label(friend)}': {to_add}")
+    return Plan(friend=friend, added=to_add, final_mask=current_mask | desired_mask, bits=bits)
+
+
+def plan_updates(
+    account: MyPlexAccount,
+    users: Iterable[object],
+    src_server: PlexServer,
     dest_server: PlexServer,
-    desired_titles: Set[str],
-    dest_title_to_section: Dict[str, object],
-    dry_run: bool,
+    src_snap: SectionSnapshot,
+    dest_snap: SectionSnapshot,
+    shares_index: Optional[Dict[object, Dict[str, object]]],
+    workers: int,
     debug: bool,
-) -> Tuple[bool, List[str], List[str]]:
+) -> List[Plan]:
     """
-    Compute union of current destination shares and desired_titles, then update friend shares on destination.
-    Returns: (changed, added_titles, final_titles_sorted)
+    Read every user's shares and return the destination updates needed, without writing anything.
     """
-    current_titles = friend_shared_sections_titles(account, friend, dest_server)
-    if debug:
-        print(f"      Current on dest: {sorted(current_titles)}")
+    dest_titles_to_sec = dest_snap.by_title_cf
 
-    desired_titles_existing = {t for t in desired_titles if t.casefold() in dest_title_to_section}
-    final_titles = set(current_titles) | set(desired_titles_existing)
+    # Casefold every known library title once, users' share titles are drawn from these
+    title_to_cf = {t: sys.intern(t.casefold()) for t in src_snap.titles | dest_snap.titles}
+    bits = build_dest_bits(dest_snap)
 
-    to_add = sorted(set(final_titles) - set(current_titles))
-    if not to_add:
-        if debug:
-            print("      No changes needed.")
-        return False, [], sorted(final_titles)
-
-    final_sections = []
-    missing = []
-    for t in final_titles:
-        sec = dest_title_to_section.get(t.casefold())
-        if sec is None:
-            missing.append(t)
-        else:
-            final_sections.append(sec)
+    plans: List[Plan] = []
+    add_plan = plans.append
+    dest_all_titles = dest_snap.titles
+
+    def read(friend):
+        return read_user_shares(
+            account, friend, src_server, dest_server, dest_titles_to_sec, shares_index,
+            src_all_titles=src_snap.titles, dest_all_titles=dest_all_titles, title_to_cf=title_to_cf,
+        )
 
-    if missing and debug:
-        print(f"      Skipping titles not on dest: {sorted(missing)}")
+    def plan_user(friend, src_titles_for_user, current_titles, err) -> None:
+        friend_label = _label(friend)
+        if err is not None:
+            print(f"[WARN] Skipping user '{friend_label}' due to error reading source shares: {err}")
+            return
 
-    friend_label = getattr(friend, "title", None) or getattr(friend, "username", None) or str(friend)
-    print(f"    Will add on dest for user '{friend_label}': {to_add}")
-    if not dry_run:
+        if not src_titles_for_user:
+            if debug:
+                print(f"  User '{friend_label}': no shares on source, skipping.")
+            return
+
+        desired_mask = titles_mask(src_titles_for_user, bits, title_to_cf)
+        if not desired_mask:
+            print(f"  User '{friend_label}': source has {sorted(src_titles_for_user)}")
+            print("    No matching libraries exist on destination. Skipping.")
+            return
+
+        if current_titles is None:
+            current_titles = friend_shared_sections_titles(account, friend, dest_server, shares_index, dest_all_titles)
+        current_mask = titles_mask(current_titles, bits, title_to_cf)
+
+        # Destination already covers the source share: nothing to add or report
+        if not desired_mask & ~current_mask:
+            if debug:
+                print(f"  User '{friend_label}': source has {sorted(src_titles_for_user)}")
+                print(f"      Current on dest: {sorted(current_titles)}")
+                print("      No changes needed.")
+            return
+
+        print(f"  User '{friend_label}': source has {sorted(src_titles_for_user)}")
+        skipped: List[str] = []
+        if debug:
+            print(f"      Current on dest: {sorted(current_titles)}")
+            # Sorting is only for the debug listing, skip it otherwise
+            skipped = [t for t in src_titles_for_user | current_titles if not titles_mask((t,), bits, title_to_cf)]
+
+        plan = plan_union_share_on_destination(friend, desired_mask, current_mask, bits, skipped)
+        if plan is not None:
+            add_plan(plan)
+
+    def finish(fut) -> None:
+        result = fut.result()
+        plan_user(*result)
+        # Only planned users are kept, through their Plan
+        _release_user(result[0], (src_server, dest_server), shares_index)
+
+    # Share lookups are independent per user, so they run on a pool. Only a small
+    # window of users is read ahead of the one being planned, and users are planned
+    # in order as their reads complete, so memory stays flat however many users
+    # the account has.
+    window = max(1, workers) * 2
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        pending = deque()
+        for friend in users:
+            pending.append(ex.submit(read, friend))
+            if len(pending) >= window:
+                finish(pending.popleft())
+        while pending:
+            finish(pending.popleft())
+    return plans
+
+
+def apply_updates(
+    account: MyPlexAccount,
+    dest_server: PlexServer,
+    plans: List[Plan],
+    workers: int = 1,
+    rate_limit_s: float = 0.0,
+) -> List[Plan]:
+    """
+    Push planned share updates to the destination. Returns the plans that were applied.
+    Writes run on up to `workers` threads, each pausing rate_limit_s after its call.
+    """
+    update_friend = account.updateFriend
+
+    def apply_one(plan: Plan) -> Optional[Exception]:
         try:
             # updateFriend sets the complete desired section list for this server
-            account.updateFriend(friend, server=dest_server, sections=final_sections)
-            print("      Applied.")
+            update_friend(plan.friend, server=dest_server, sections=plan.final_sections)
+            _forget_user_on_server(plan.friend, dest_server)
+            err = None
         except Exception as e:
-            print(f"      ERROR applying updateFriend for '{friend_label}': {e}")
-            return False, [], sorted(final_titles)
-
-    return True, to_add, sorted(final_titles)
+            err = e
+        if rate_limit_s > 0:
+            time.sleep(rate_limit_s)
+        return err
+
+    applied: List[Plan] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        for plan, err in zip(plans, ex.map(apply_one, plans)):
+            label = _label(plan.friend)
+            if err is not None:
+                print(f"  ERROR applying updateFriend for '{label}': {err}")
+                continue
+            print(f"  Applied for '{label}': {plan.added}")
+            applied.append(plan)
+    return applied
 
 
 def main():
@@ -286,18 +768,22 @@ def main():
     parser.add_argument("--only-user", action="append", default=[], help="Limit to one or more usernames or emails. Repeatable.")
     parser.add_argument("--mfa-code", default=None, help="Provide a Plex 2FA code up front. If omitted and MFA is required, you will be prompted unless --non-interactive is set.")
     parser.add_argument("--non-interactive", action="store_true", help="Disable interactive prompts, including MFA prompts.")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel workers for reading user shares. Default: 8")
+    parser.add_argument("--apply-workers", type=int, default=1, help="Parallel workers for applying updates with --apply. Default: 1, one user at a time")
+    parser.add_argument("--cache-ttl", type=float, default=0.0, help="Cache each server's address and library names on disk for this many seconds (under ~/.cache/plex_tools). Default: 0, no cache")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Seconds each apply worker waits after an update, to stay under plex.tv rate limits. Default: 0")
     args = parser.parse_args()
 
     try:
-        account = load_account(args)
+        account = load_account(args, build_session())
     except Exception as e:
         print(f"Auth error: {e}")
         sys.exit(1)
 
     # Connect servers
     try:
-        src_server = connect_server_by_name(account, args.source)
-        dest_server = connect_server_by_name(account, args.dest)
+        src_server = connect_server_by_name(account, args.source, cache_ttl=args.cache_ttl)
+        dest_server = connect_server_by_name(account, args.dest, cache_ttl=args.cache_ttl)
     except Exception as e:
         print(e)
         sys.exit(1)
@@ -309,19 +795,16 @@ def main():
     else:
         print("Mode: APPLY changes")
 
-    # Build section maps
-    src_titles_to_sec = sections_by_title(src_server)
-    dest_titles_to_sec = sections_by_title(dest_server)
-
-    src_titles_set = {s.title for s in src_server.library.sections()}
-    dest_titles_set = {s.title for s in dest_server.library.sections()}
+    # Build section maps, one sections() call per server
+    src_snap = snapshot_sections(src_server, cache_ttl=args.cache_ttl)
+    dest_snap = snapshot_sections(dest_server, cache_ttl=args.cache_ttl)
     if args.debug:
-        print(f"Source libraries: {sorted(src_titles_set)}")
-        print(f"Destination libraries: {sorted(dest_titles_set)}")
+        print(f"Source libraries: {sorted(src_snap.titles)}")
+        print(f"Destination libraries: {sorted(dest_snap.titles)}")
 
-    # Fetch all users this account knows about
+    # Stream the users this account knows about, they are filtered and indexed as they are parsed
     try:
-        users = account.users()
+        users = stream_users(account)
     except Exception as e:
         print(f"ERROR: Could not retrieve account users: {e}")
         sys.exit(1)
@@ -337,50 +820,35 @@ def main():
             ]
             return any(c and c.casefold() in lc_targets for c in cand)
 
-        users = [u for u in users if matches(u)]
-        if not users:
-            print("No users matched --only-user filters. Exiting.")
-            sys.exit(0)
-
-    total_changed = 0
-    total_added = 0
-    print("\nScanning users and planning updates:\n")
-    for friend in users:
-        friend_label = getattr(friend, "title", None) or getattr(friend, "username", None) or str(friend)
-        try:
-            src_titles_for_user = friend_shared_sections_titles(account, friend, src_server)
-        except Exception as e:
-            print(f"[WARN] Skipping user '{friend_label}' due to error reading source shares: {e}")
-            continue
-
-        if not src_titles_for_user:
-            if args.debug:
-                print(f"  User '{friend_label}': no shares on source, skipping.")
-            continue
+        users = (u for u in users if matches(u))
 
-        desired_titles = {t for t in src_titles_for_user if t.casefold() in dest_titles_to_sec}
+    # One snapshot of every user's shares instead of resolving each user per server
+    shares_index: Dict[object, Dict[str, object]] = {}
+    users = index_user_shares(users, shares_index)
+    # Counts the users that reach planning, it advances once per user zip takes from the stream
+    user_count = itertools.count()
+    users = (u for u, _ in zip(users, user_count))
 
-        print(f"  User '{friend_label}': source has {sorted(src_titles_for_user)}")
-        if not desired_titles:
-            print("    No matching libraries exist on destination. Skipping.")
-            continue
+    # One shared_servers document per server covers every user's shared titles
+    prime_shares_from_server(account, src_server, src_snap.titles, args.debug)
+    prime_shares_from_server(account, dest_server, dest_snap.titles, args.debug)
 
-        changed, added, final = ensure_union_share_on_destination(
-            account,
-            friend,
-            dest_server,
-            desired_titles,
-            dest_titles_to_sec,
-            dry_run=(not args.apply),
-            debug=args.debug,
-        )
-        if changed:
-            total_changed += 1
-            total_added += len(added)
+    print("\nScanning users and planning updates:\n")
+    plans = plan_updates(
+        account, users, src_server, dest_server, src_snap, dest_snap, shares_index,
+        workers=args.workers, debug=args.debug,
+    )
+    if args.only_user and next(user_count) == 0:
+        print("No users matched --only-user filters. Exiting.")
+        sys.exit(0)
+
+    if args.apply and plans:
+        print("\nApplying updates:\n")
+        plans = apply_updates(account, dest_server, plans, workers=args.apply_workers, rate_limit_s=args.rate_limit)
 
     print("\nSummary:")
-    print(f"  Users updated: {total_changed}")
-    print(f"  Library grants added on destination: {total_added}")
+    print(f"  Users updated: {len(plans)}")
+    print(f"  Library grants added on destination: {sum(len(p.added) for p in plans)}")
     if not args.apply:
         print("  No changes were applied because this was a dry run. Use --apply to push updates.")
 
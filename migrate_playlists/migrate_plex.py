@@ -34,21 +34,50 @@ Examples
 from __future__ import annotations
 
 import argparse
+import io
+import json
+import operator
 import os
 import re
+import sqlite3
 import sys
-import tempfile
-from typing import Dict, List, Optional, Tuple
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
 
 import requests
 import urllib3
+import xml.etree.ElementTree as ET
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from plexapi.exceptions import BadRequest
+from plexapi.playlist import Playlist
 from plexapi.server import PlexServer
 
 
 # ------------------------------ Utils ------------------------------
 
+# Phases and worker pools print from several threads, one line at a time
+_PRINT_LOCK = threading.Lock()
+
+# Name of the phase a thread works for, prefixed to its lines while phases run side by side
+_PHASE = threading.local()
+
+# Set on Ctrl-C, the phase loops stop at their next item
+_STOP = threading.Event()
+
+
+def _set_phase(name: Optional[str]) -> None:
+    _PHASE.name = name
+
+
+def _current_phase() -> Optional[str]:
+    return getattr(_PHASE, "name", None)
+
+
 def eprint(*args, **kwargs):
     """Robust stderr printer that avoids relying on print(file=...).
 
@@ -58,36 +87,94 @@ def eprint(*args, **kwargs):
     sep = kwargs.get("sep", " ")
     end = kwargs.get("end", "\n")
     msg = sep.join(str(a) for a in args) + end
-    try:
-        sys.stderr.write(msg)
-    except Exception:
+    phase = _current_phase()
+    if phase:
+        msg = f"[{phase}] {msg}"
+    with _PRINT_LOCK:
         try:
-            # last resort: stdout
-            sys.stdout.write(msg)
+            sys.stderr.write(msg)
         except Exception:
-            pass
+            try:
+                # last resort: stdout
+                sys.stdout.write(msg)
+            except Exception:
+                pass
 
 
-def connect_plex(url: str, token: str, insecure: bool) -> PlexServer:
+def build_session(insecure: bool) -> requests.Session:
+    """Pooled keep-alive session with retries, shared by both servers.
+
+    The pool is sized for the parallel indexing and artwork workers. Reads
+    that get a 429 or 5xx are retried with backoff. Edits, playlist adds and
+    deletes are sent once, since repeating them could apply them twice. When
+    retries run out the last response is returned, so plexapi raises its usual
+    BadRequest for the callers' fallbacks.
+    """
     sess = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64, max_retries=retry)
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    sess.headers.update({"Accept-Encoding": "gzip"})
     if insecure:
         sess.verify = False
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    return PlexServer(url, token, session=sess)
+    return sess
+
+
+def connect_plex(url: str, token: str, insecure: bool, session: Optional[requests.Session] = None) -> PlexServer:
+    return PlexServer(url, token, session=session or build_session(insecure))
+
+
+def media_sections(plex: PlexServer) -> List[object]:
+    """Movie and show sections of a server, the only ones this script works on."""
+    return [s for s in plex.library.sections() if s.TYPE.lower() in ("movie", "show")]
 
 
 def collect_guids(item) -> List[str]:
+    """Provider GUIDs of an item, stripped, lowercased and interned for use as index keys."""
     out = []
     try:
         for g in getattr(item, "guids", []) or []:
             gid = getattr(g, "id", None)
             if gid:
-                out.append(gid.strip())
+                out.append(sys.intern(gid.strip().lower()))
     except Exception:
         pass
     return out
 
 
+# On-disk caches, shared with the other plex_tools scripts
+CACHE_DIR = os.getenv("PLEX_TOOLS_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "plex_tools")
+
+
+def _load_json(path: str) -> Dict:
+    """Read a JSON object cache file, an unreadable or missing file reads as empty."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_json(path: str, data: Dict) -> None:
+    tmp = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError as ex:
+        eprint(f"Warning: could not save cache {path}: {ex}")
+
+
 def rating_key(it):
     try:
         return getattr(it, "ratingKey", None) or getattr(it, "rating_key", None)
@@ -98,56 +185,326 @@ def rating_key(it):
 # ------------------------------ Index the destination ------------------------------
 
 class DestIndex:
-    def __init__(self) -> None:
-        self.by_guid: Dict[str, object] = {}
+    """Destination GUID to ratingKey map.
+
+    Only ratingKeys are kept, so plexapi objects can be released once indexed.
+    With keep_items the objects are also kept in `items`, for callers that read
+    fields off the destination items.
+    """
+
+    def __init__(self, keep_items: bool = False) -> None:
+        self.by_guid: Dict[str, int] = {}
+        self.items: Dict[int, object] = {}
+        self.keep_items = keep_items
         self.count_items = 0
 
     def add_item(self, it):
-        for gid in collect_guids(it):
-            self.by_guid[gid.lower()] = it
+        rk = rating_key(it)
+        self.add_guids(rk, collect_guids(it))
+        if self.keep_items and rk is not None:
+            self.items[rk] = it
+
+    def add_guids(self, rk: Optional[int], guids: List[str]) -> None:
         self.count_items += 1
+        if rk is None:
+            return
+        for gid in guids:
+            self.by_guid[gid] = rk
+
+
+def match_item(idx: DestIndex, it, cache: Dict[object, Tuple[Optional[int], List[str]]]) -> Tuple[Optional[int], List[str]]:
+    """Destination ratingKey for a source item (or None) and the item's GUIDs.
+
+    Results are memoized in cache by source ratingKey. Items recur across
+    playlists and collections, and reading GUIDs can cost a reload.
+    """
+    rk_src = rating_key(it)
+    if rk_src is not None:
+        hit = cache.get(rk_src)
+        if hit is not None:
+            return hit
+    guids = collect_guids(it)
+    matched = None
+    for gid in guids:
+        matched = idx.by_guid.get(gid)
+        if matched:
+            break
+    if rk_src is not None:
+        cache[rk_src] = (matched, guids)
+    return matched, guids
+
+
+def default_index_workers() -> int:
+    return min(32, (os.cpu_count() or 4) + 4)
+
 
+# Items per page for library listings, plexapi defaults to 100
+CONTAINER_SIZE = 1000
+
+# Listing parameters for the lightweight index: GUIDs only, no extras or markers
+_LITE_PARAMS = {"includeGuids": 1, "includeMeta": 0, "includeMarkers": 0, "includeExtras": 0}
+
+
+def _lite_page(plex: PlexServer, path: str, params: Dict[str, object]) -> Tuple[List[Tuple[int, List[str]]], int, int]:
+    """Fetch one page of a library listing as (rows, items on the page, totalSize).
+
+    The response is streamed and parsed incrementally with ElementTree, and
+    each item is cleared once its ratingKey and Guid children are read, so no
+    full tree is built for the page.
+    """
+    resp = plex._session.get(plex.url(path), headers=plex._headers(), params=params, timeout=plex._timeout, stream=True)
+    with resp:
+        if resp.status_code not in (200, 201, 204):
+            raise BadRequest(f"({resp.status_code}) {resp.url} {resp.text[:200]}")
+        if resp.status_code == 204:
+            return [], 0, 0
+        resp.raw.decode_content = True
+        rows: List[Tuple[int, List[str]]] = []
+        count = 0
+        total = 0
+        depth = 0
+        for event, elem in ET.iterparse(resp.raw, events=("start", "end")):
+            if event == "start":
+                if depth == 0:
+                    total = int(elem.attrib.get("totalSize") or 0)
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            count += 1
+            rk = elem.attrib.get("ratingKey")
+            if rk:
+                guids = [sys.intern(g.attrib["id"].strip().lower()) for g in elem.findall("Guid") if g.attrib.get("id")]
+                rows.append((int(rk), guids))
+            elem.clear()
+    return rows, count, total
 
-def build_destination_index(plex: PlexServer, debug: bool = False) -> DestIndex:
-    idx = DestIndex()
-    sections = [s for s in plex.library.sections() if s.TYPE.lower() in ("movie", "show")]
+
+def _lite_all(
+    plex: PlexServer,
+    path: str,
+    page_size: int = CONTAINER_SIZE,
+    extra_params: Optional[Dict[str, object]] = None,
+) -> Iterator[Tuple[int, List[str]]]:
+    """Yield (ratingKey, guids) for every item under a library listing path.
+
+    Pages through the raw XML and reads attributes directly, so no plexapi
+    objects are built. GUIDs are normalized the same way as collect_guids.
+    """
+    start = 0
+    while True:
+        params = dict(_LITE_PARAMS, **(extra_params or {}))
+        params["X-Plex-Container-Start"] = start
+        params["X-Plex-Container-Size"] = page_size
+        rows, count, total = _lite_page(plex, path, params)
+        yield from rows
+        start += count
+        if count < page_size or (total and start >= total):
+            return
+
+
+def _show_episodes(show) -> List[object]:
+    try:
+        return show.episodes()
+    except Exception as ex:
+        eprint(f"  Warning: could not enumerate episodes for {show.title}: {ex}")
+        return []
+
+
+def _lite_show_episodes(plex: PlexServer, show_key: int) -> List[Tuple[int, List[str]]]:
+    try:
+        return list(_lite_all(plex, f"/library/metadata/{show_key}/allLeaves"))
+    except Exception as ex:
+        eprint(f"  Warning: could not enumerate episodes for show ratingKey={show_key}: {ex}")
+        return []
+
+
+def _index_stamp(sections) -> str:
+    """Fingerprint of the indexed sections, changes when any of them is scanned or edited."""
+    parts = []
     for s in sections:
-        try:
+        data = getattr(s, "_data", None)
+        changed = data.attrib.get("contentChangedAt", "") if data is not None else ""
+        updated = int(s.updatedAt.timestamp()) if getattr(s, "updatedAt", None) else 0
+        parts.append(f"{s.key}:{updated}:{changed}")
+    return ",".join(parts)
+
+
+def build_destination_index(
+    plex: PlexServer,
+    debug: bool = False,
+    workers: int = 0,
+    keep_items: bool = False,
+    cache: bool = False,
+    slow: bool = False,
+    sections: Optional[List[object]] = None,
+) -> DestIndex:
+    """Index destination movies and episodes by GUID.
+
+    Movie sections and each show's episodes are fetched on a thread pool of
+    `workers` threads. Results are merged on the calling thread in section and
+    show order, so the index is the same as a serial walk. Unless keep_items is
+    set, the raw listings are read with _lite_all and no plexapi objects are built.
+
+    Episodes of a show section are listed in one paged request. The show by show
+    walk is used with slow, or for a section whose bulk listing fails.
+
+    With cache, the GUID map is saved under CACHE_DIR and reused while the
+    sections' updatedAt and contentChangedAt are unchanged. Indexes with
+    keep_items hold live objects and are never cached.
+
+    sections, if given, are the server's media_sections listed by the caller.
+    """
+    idx = DestIndex(keep_items=keep_items)
+    if sections is None:
+        sections = media_sections(plex)
+
+    cache_path = os.path.join(CACHE_DIR, f"dest_index_{plex.machineIdentifier}.json") if cache and not keep_items else None
+    if cache_path:
+        stamp = _index_stamp(sections)
+        cached = _load_json(cache_path)
+        if cached.get("stamp") == stamp and isinstance(cached.get("by_guid"), dict):
+            idx.by_guid = {sys.intern(g): rk for g, rk in cached["by_guid"].items()}
+            idx.count_items = cached.get("count_items", 0)
+            eprint(f"Loaded {len(idx.by_guid)} destination GUIDs from cache, libraries unchanged")
+            return idx
+
+    with ThreadPoolExecutor(max_workers=max(1, workers or default_index_workers())) as pool:
+
+        def lite_list(path: str, extra_params: Optional[Dict[str, object]] = None) -> List[Tuple[int, List[str]]]:
+            return list(_lite_all(plex, path, extra_params=extra_params))
+
+        def per_show(s) -> list:
+            """Submit one episodes task per show of section s."""
+            if keep_items:
+                return [pool.submit(_show_episodes, show) for show in s.all(container_size=CONTAINER_SIZE)]
+            shows = [rk for rk, _ in _lite_all(plex, f"/library/sections/{s.key}/all")]
+            return [pool.submit(_lite_show_episodes, plex, rk) for rk in shows]
+
+        # (section, futures, fallback submitting the show by show walk if the bulk listing fails)
+        pending = []
+        for s in sections:
             eprint(f"Indexing destination section '{s.title}' ({s.TYPE})...")
+            section_path = f"/library/sections/{s.key}/all"
             if s.TYPE.lower() == "movie":
-                for it in s.all():
-                    idx.add_item(it)
-            else:
-                for show in s.all():
-                    try:
-                        for ep in show.episodes():
-                            idx.add_item(ep)
-                    except Exception as ex:
-                        eprint(f"  Warning: could not enumerate episodes for {show.title}: {ex}")
-        except Exception as ex:
-            eprint(f"Warning: failed to index section {s.title}: {ex}")
+                if keep_items:
+                    pending.append((s, [pool.submit(s.all, container_size=CONTAINER_SIZE)], None))
+                else:
+                    pending.append((s, [pool.submit(lite_list, section_path)], None))
+                continue
+            if not slow:
+                if keep_items:
+                    fut = pool.submit(s.search, libtype="episode", container_size=CONTAINER_SIZE)
+                else:
+                    fut = pool.submit(lite_list, section_path, {"type": 4})
+                pending.append((s, [fut], per_show))
+                continue
+            try:
+                pending.append((s, per_show(s), None))
+            except Exception as ex:
+                eprint(f"Warning: failed to index section {s.title}: {ex}")
+        for s, futs, fallback in pending:
+            try:
+                results = [fut.result() for fut in futs]
+            except Exception as ex:
+                if fallback is None:
+                    eprint(f"Warning: failed to index section {s.title}: {ex}")
+                    continue
+                eprint(f"Warning: bulk episode listing failed for {s.title}, indexing show by show: {ex}")
+                try:
+                    results = [fut.result() for fut in fallback(s)]
+                except Exception as ex2:
+                    eprint(f"Warning: failed to index section {s.title}: {ex2}")
+                    continue
+            for items in results:
+                for it in items:
+                    if keep_items:
+                        idx.add_item(it)
+                    else:
+                        idx.add_guids(*it)
     eprint(f"Indexed {len(idx.by_guid)} GUIDs across ~{idx.count_items} destination items")
+    if cache_path:
+        _save_json(cache_path, {"stamp": stamp, "by_guid": idx.by_guid, "count_items": idx.count_items})
     return idx
 
 
 # ------------------------------ Playlist helpers ------------------------------
 
+# ratingKeys per /library/metadata/k1,k2,... request, keeps URLs well under server limits
+_FETCH_BATCH = 200
+
+
 def _coerce_to_media(plex: PlexServer, items: List[object], debug: bool = False) -> List[object]:
-    out: List[object] = []
+    """Resolve ratingKeys to Media objects, keeping order and passing Media objects through.
+
+    Keys are fetched in batches with one request each. Keys a batch did not
+    return are fetched one by one, so a bad key only costs its own item.
+    """
+    keys: List[int] = []
     for it in items:
+        if hasattr(it, "_server"):
+            continue
+        if isinstance(it, int) or (isinstance(it, str) and str(it).isdigit()):
+            keys.append(int(it))
+
+    fetched: Dict[int, object] = {}
+    for i in range(0, len(keys), _FETCH_BATCH):
+        batch = keys[i : i + _FETCH_BATCH]
         try:
-            if hasattr(it, "_server"):
-                out.append(it)
-            elif isinstance(it, int) or (isinstance(it, str) and str(it).isdigit()):
-                media = plex.fetchItem(f"/library/metadata/{it}")
-                out.append(media)
-            else:
-                eprint(f"  Warning: cannot coerce item of type {type(it)} to Media, skipping")
+            for media in plex.fetchItems(f"/library/metadata/{','.join(str(k) for k in batch)}"):
+                fetched[rating_key(media)] = media
         except Exception as ex:
-            eprint(f"  Warning: failed to fetch Media for ratingKey={it}: {ex}")
+            if debug:
+                eprint(f"  Batch fetch of {len(batch)} items failed, fetching one by one: {ex}")
+        for rk in batch:
+            if rk in fetched:
+                continue
+            try:
+                fetched[rk] = plex.fetchItem(f"/library/metadata/{rk}")
+            except Exception as ex:
+                eprint(f"  Warning: failed to fetch Media for ratingKey={rk}: {ex}")
+
+    out: List[object] = []
+    for it in items:
+        if hasattr(it, "_server"):
+            out.append(it)
+        elif isinstance(it, int) or (isinstance(it, str) and str(it).isdigit()):
+            media = fetched.get(int(it))
+            if media is not None:
+                out.append(media)
+        else:
+            eprint(f"  Warning: cannot coerce item of type {type(it)} to Media, skipping")
     return out
 
 
+def _coerced_chunks(plex: PlexServer, chunks, workers: int, debug: bool = False):
+    """Yield (chunk, media) pairs in order, resolving ratingKeys for upcoming chunks on a small pool.
+
+    Only the lookups run in parallel. Callers add each chunk in turn so playlist order is kept.
+    """
+    window = max(1, workers)
+    with ThreadPoolExecutor(max_workers=window, initializer=_set_phase, initargs=(_current_phase(),)) as pool:
+        # At most `window` chunks are resolved ahead of the one being added
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(_coerce_to_media, plex, chunk, debug)))
+            if len(pending) >= window:
+                head, fut = pending.popleft()
+                yield head, fut.result()
+        while pending:
+            head, fut = pending.popleft()
+            yield head, fut.result()
+
+
+# Longest encoded playlist URI sent in a single create request, Plex rejects URLs much past 8 KB
+_MAX_URI_LEN = 7000
+
+
+def _library_uri(plex: PlexServer, keys: List[object]) -> str:
+    return f"server://{plex.machineIdentifier}/com.plexapp.plugins.library/library/metadata/{','.join(str(k) for k in keys)}"
+
+
 def find_existing_playlist(plex: PlexServer, name: str):
     try:
         for pl in plex.playlists():
@@ -158,6 +515,26 @@ def find_existing_playlist(plex: PlexServer, name: str):
     return None
 
 
+def _playlists_by_name(plex: PlexServer) -> Dict[str, object]:
+    """Destination playlists by title, the first one wins for duplicate titles."""
+    out: Dict[str, object] = {}
+    for pl in plex.playlists():
+        out.setdefault(pl.title, pl)
+    return out
+
+
+def _post_playlist(plex: PlexServer, name: str, uri: str):
+    """Create a static video playlist from a library URI, built from the response."""
+    data = plex.query(
+        "/playlists",
+        method=plex._session.post,
+        params={"type": "video", "title": name, "smart": 0, "uri": uri},
+    )
+    if data is None or not len(data):
+        return find_existing_playlist(plex, name)
+    return Playlist(plex, data[0], initpath="/playlists")
+
+
 def create_playlist_with_batches(
     plex: PlexServer,
     name: str,
@@ -165,20 +542,49 @@ def create_playlist_with_batches(
     replace: bool,
     batch_size: int,
     debug: bool,
+    workers: int = 4,
+    existing_by_name: Optional[Dict[str, object]] = None,
 ) -> object:
+    """Create playlist `name` from items, or append to an existing one.
+
+    existing_by_name, if given, is the caller's map of destination playlists by
+    title. It is used instead of listing the playlists, and kept up to date.
+    """
     def chunks(lst, n):
         for i in range(0, len(lst), n):
             yield lst[i : i + n]
 
-    existing = find_existing_playlist(plex, name)
+    if existing_by_name is None:
+        existing = find_existing_playlist(plex, name)
+    else:
+        existing = existing_by_name.get(name)
     if existing and replace:
         eprint(f"Deleting existing playlist: {name}")
         existing.delete()
         existing = None
+        if existing_by_name is not None:
+            existing_by_name.pop(name, None)
 
     if existing is None:
         if not items:
             raise RuntimeError("No items to create a playlist with")
+
+        # Whole playlist in one request when every key fits in the URI
+        keys = [rating_key(it) if hasattr(it, "_server") else it for it in items]
+        uri = _library_uri(plex, keys)
+        if None not in keys and len(quote(uri, safe="")) <= _MAX_URI_LEN:
+            try:
+                pl = _post_playlist(plex, name, uri)
+            except BadRequest as br:
+                eprint(f"Single request create rejected, falling back to batches: {br}")
+            else:
+                if pl is None:
+                    raise RuntimeError(f"Playlist '{name}' was created but could not be found")
+                eprint(f"Created playlist '{name}' with {len(items)} items in one request")
+                if existing_by_name is not None:
+                    existing_by_name[name] = pl
+                return pl
+
         seed = items[:1]
         rest = items[1:]
         eprint(f"Creating playlist '{name}' with 1 seed item, then adding {len(rest)} in batches of {batch_size}")
@@ -191,22 +597,19 @@ def create_playlist_with_batches(
                 rk = seed_val if isinstance(seed_val, int) or (isinstance(seed_val, str) and str(seed_val).isdigit()) else rating_key(seed_val)
                 if rk is None:
                     raise
-                uri = f"server://{plex.machineIdentifier}/com.plexapp.plugins.library/library/metadata/{rk}"
-                plex.query(
-                    "/playlists",
-                    method=plex._session.post,
-                    params={"type": "video", "title": name, "smart": 0, "uri": uri},
-                )
-                pl = find_existing_playlist(plex, name)
+                pl = _post_playlist(plex, name, _library_uri(plex, [rk]))
                 if pl is None:
                     raise
             else:
                 raise
-        for chunk in chunks(rest, batch_size):
+        if existing_by_name is not None:
+            existing_by_name[name] = pl
+        for chunk, chunk_objs in _coerced_chunks(plex, chunks(rest, batch_size), workers, debug=debug):
+            if _STOP.is_set():
+                break
             try:
                 if debug:
                     eprint(f"Adding batch of {len(chunk)} items to '{name}'...")
-                chunk_objs = _coerce_to_media(plex, chunk, debug=debug)
                 pl.addItems(chunk_objs)
             except BadRequest as br:
                 if "Must include items to add" in str(br):
@@ -223,11 +626,12 @@ def create_playlist_with_batches(
         return pl
 
     # append to existing
-    for chunk in chunks(items, batch_size):
+    for chunk, chunk_objs in _coerced_chunks(plex, chunks(items, batch_size), workers, debug=debug):
+        if _STOP.is_set():
+            break
         try:
             if debug:
                 eprint(f"Appending batch of {len(chunk)} items to '{name}'...")
-            chunk_objs = _coerce_to_media(plex, chunk, debug=debug)
             existing.addItems(chunk_objs)
         except BadRequest as br:
             if "Must include items to add" in str(br):
@@ -246,29 +650,88 @@ def create_playlist_with_batches(
 
 # ------------------------------ Collections ------------------------------
 
-def _remove_collection(plex: PlexServer, name: str, debug: bool = False) -> int:
-    total = 0
-    for s in plex.library.sections():
-        if s.TYPE.lower() not in ("movie", "show"):
+def _collections_by_name(plex: PlexServer, debug: bool = False, sections: Optional[List[object]] = None) -> Dict[str, List[object]]:
+    """Destination collections by title, listed once per section."""
+    out: Dict[str, List[object]] = defaultdict(list)
+    for s in sections if sections is not None else media_sections(plex):
+        try:
+            for coll in s.collections():
+                out[coll.title].append(coll)
+        except Exception as ex:
+            if debug:
+                eprint(f"  Could not list collections in section {s.title}: {ex}")
+    return out
+
+
+# Items per multi-edit request, keeps the id list in the URL reasonable
+_EDIT_BATCH = 200
+
+
+def _batch_collection_edit(items: List[object], name: str, remove: bool, debug: bool = False) -> List[object]:
+    """Add or remove collection `name` with one multi-edit request per section, type and batch.
+
+    Returns the items that could not be edited in a batch, for the caller to edit one by one.
+    Only removal is batched by callers. A multi-edit add sends just `name`, without
+    merging each item's other collections the way an item edit does, and it has not
+    been checked against a server that Plex appends rather than replaces.
+    """
+    groups: Dict[Tuple[object, object], List[object]] = defaultdict(list)
+    leftover: List[object] = []
+    for it in items:
+        if hasattr(it, "section") and getattr(it, "librarySectionID", None) is not None:
+            groups[(it.librarySectionID, getattr(it, "type", None))].append(it)
+        else:
+            leftover.append(it)
+    for group in groups.values():
+        try:
+            section = group[0].section()
+        except Exception as ex:
+            if debug:
+                eprint(f"  Could not resolve section for batch collection edit: {ex}")
+            leftover.extend(group)
             continue
+        for i in range(0, len(group), _EDIT_BATCH):
+            batch = group[i : i + _EDIT_BATCH]
+            try:
+                section.batchMultiEdits(batch)
+                if remove:
+                    section.removeCollection(name)
+                else:
+                    section.addCollection(name)
+                section.saveMultiEdits()
+            except Exception as ex:
+                if debug:
+                    eprint(f"  Batch collection edit of {len(batch)} items failed, editing one by one: {ex}")
+                leftover.extend(batch)
+    return leftover
+
+
+def _remove_collection(name: str, existing: Dict[str, List[object]], debug: bool = False) -> int:
+    """Clear membership of collection `name`, using the collections listed by _collections_by_name."""
+    total = 0
+    for coll in existing.pop(name, []):
         try:
-            hits = s.search(collection=name)
-            for it in hits:
-                try:
-                    if hasattr(it, "removeCollection"):
-                        it.removeCollection(name)
-                    else:
-                        it.editTags("collection", [name], remove=True)
-                    total += 1
-                except Exception as ex:
-                    eprint(f"  Warning: failed to remove from {getattr(it, 'title', '<item>')}: {ex}")
+            hits = coll.items()
         except Exception as ex:
             if debug:
-                eprint(f"  Search failed in section {s.title} for collection '{name}': {ex}")
+                eprint(f"  Could not list items of collection '{name}': {ex}")
+            continue
+        pending = _batch_collection_edit(hits, name, remove=True, debug=debug)
+        total += len(hits) - len(pending)
+        for it in pending:
+            try:
+                if hasattr(it, "removeCollection"):
+                    it.removeCollection(name)
+                else:
+                    it.editTags("collection", [name], remove=True)
+                total += 1
+            except Exception as ex:
+                eprint(f"  Warning: failed to remove from {getattr(it, 'title', '<item>')}: {ex}")
     return total
 
 
 def _add_collection_to_items(name: str, items: List[object], debug: bool = False) -> int:
+    # One edit per item, so each item's existing collections are merged in and kept
     ok = 0
     for it in items:
         try:
@@ -288,28 +751,35 @@ def _add_collection_to_items(name: str, items: List[object], debug: bool = False
 def migrate_collections(
     src: PlexServer,
     dest: PlexServer,
-    include: Optional[str],
-    exclude: Optional[str],
+    include_re: Optional[re.Pattern],
+    exclude_re: Optional[re.Pattern],
     rename_template: str,
     replace: bool,
     debug: bool,
     dry_run: bool,
+    index_workers: int = 0,
+    idx: Optional[DestIndex] = None,
+    src_sections: Optional[List[object]] = None,
+    dest_sections: Optional[List[object]] = None,
 ):
-    include_re = re.compile(include) if include else None
-    exclude_re = re.compile(exclude) if exclude else None
-
-    idx = build_destination_index(dest, debug=debug)
+    if idx is None:
+        idx = build_destination_index(dest, debug=debug, workers=index_workers, sections=dest_sections)
+    match_cache: Dict[object, Tuple[Optional[int], List[str]]] = {}
+    # Destination collections by name, listed on first use by --replace
+    existing: Optional[Dict[str, List[object]]] = None
 
     migrated = 0
-    for s in src.library.sections():
-        if s.TYPE.lower() not in ("movie", "show"):
-            continue
+    for s in src_sections if src_sections is not None else media_sections(src):
+        if _STOP.is_set():
+            break
         try:
             colls = s.collections()
         except Exception as ex:
             eprint(f"Warning: could not list collections for section {s.title}: {ex}")
             continue
         for coll in colls:
+            if _STOP.is_set():
+                break
             try:
                 name = getattr(coll, "title", None) or "<untitled>"
                 if include_re and not include_re.search(name):
@@ -325,21 +795,21 @@ def migrate_collections(
                 if debug:
                     eprint(f"Collection '{name}': {len(items)} items")
 
-                dest_items: List[object] = []
+                dest_items: List[int] = []
                 missing = 0
                 seen = set()
+                seen_src = set()
                 for it in items:
-                    guids = [g.lower() for g in collect_guids(it)]
-                    matched = None
-                    for gid in guids:
-                        matched = idx.by_guid.get(gid)
-                        if matched:
-                            break
+                    rk_src = rating_key(it)
+                    if rk_src is not None:
+                        if rk_src in seen_src:
+                            continue
+                        seen_src.add(rk_src)
+                    matched, _ = match_item(idx, it, match_cache)
                     if matched is not None:
-                        rk = rating_key(matched)
-                        if rk is None or rk in seen:
+                        if matched in seen:
                             continue
-                        seen.add(rk)
+                        seen.add(matched)
                         dest_items.append(matched)
                     else:
                         missing += 1
@@ -354,11 +824,14 @@ def migrate_collections(
                     continue
 
                 if replace:
-                    removed = _remove_collection(dest, dest_name, debug=debug)
+                    if existing is None:
+                        existing = _collections_by_name(dest, debug=debug, sections=dest_sections)
+                    removed = _remove_collection(dest_name, existing, debug=debug)
                     if debug:
                         eprint(f"  Cleared existing membership for '{dest_name}' from {removed} items")
 
-                added = _add_collection_to_items(dest_name, dest_items, debug=debug)
+                # The index holds ratingKeys, fetch the items only now that they are edited
+                added = _add_collection_to_items(dest_name, _coerce_to_media(dest, dest_items, debug=debug), debug=debug)
                 eprint(f"Created or updated collection '{dest_name}' with {added} items. Missed {missing}.")
                 migrated += 1
             except Exception as ex:
@@ -378,17 +851,39 @@ SYNCABLE_FIELDS = [
 ]
 
 
+_field_getters: Dict[Tuple[str, ...], operator.attrgetter] = {}
+
+
+def _fields_getter(fields: List[str]) -> operator.attrgetter:
+    key = tuple(fields)
+    getter = _field_getters.get(key)
+    if getter is None:
+        getter = _field_getters[key] = operator.attrgetter(*key)
+    return getter
+
+
 def _diff_fields(src, dest, fields: List[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    if not fields:
+        return {}
+    get = _fields_getter(fields)
+    try:
+        svals, dvals = get(src), get(dest)
+        if len(fields) == 1:
+            svals, dvals = (svals,), (dvals,)
+    except AttributeError:
+        # An item without one of the fields, read them one by one with None for the missing ones
+        svals = tuple(getattr(src, f, None) for f in fields)
+        dvals = tuple(getattr(dest, f, None) for f in fields)
     diffs = {}
-    for f in fields:
-        sv = getattr(src, f, None)
-        dv = getattr(dest, f, None)
+    for f, sv, dv in zip(fields, svals, dvals):
+        if sv == dv:
+            continue
         if str(sv or "").strip() != str(dv or "").strip():
             diffs[f] = (sv, dv)
     return diffs
 
 
-def _apply_fields(dest, values: Dict[str, object], lock: bool, debug: bool = False) -> None:
+def _apply_fields(dest, values: Dict[str, object], lock: bool, debug: bool = False) -> bool:
     try:
         dest.edit(**values)
         dest.save()
@@ -400,41 +895,168 @@ def _apply_fields(dest, values: Dict[str, object], lock: bool, debug: bool = Fal
                     pass
         if debug:
             eprint(f"  Applied fields: {list(values.keys())}")
+        return True
     except Exception as ex:
         eprint(f"  Warning: failed to edit fields {list(values.keys())}: {ex}")
+        return False
+
+
+SYNC_STATE_PATH = os.path.join(CACHE_DIR, "sync.db")
+
+# Synced items recorded per sqlite commit
+_SYNC_COMMIT_EVERY = 500
 
 
-def _copy_artwork(src_server: PlexServer, src_item, dest_item, debug: bool = False):
-    # Poster
+def _timestamp(value) -> int:
     try:
-        if getattr(src_item, "thumb", None):
-            url = src_server.url(src_item.thumb)
-            with src_server._session.get(url, stream=True) as r:
-                r.raise_for_status()
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as fp:
-                    for chunk in r.iter_content(1024 * 64):
-                        fp.write(chunk)
-                    tmp = fp.name
-            dest_item.uploadPoster(tmp)
-            if debug:
-                eprint("  Poster copied")
+        return int(value.timestamp()) if value is not None else 0
+    except (AttributeError, OverflowError, OSError, ValueError):
+        return 0
+
+
+class SyncState:
+    """
+    Source updatedAt recorded for each destination item the last time its
+    metadata was synced. An item whose source has not been updated since, with
+    the same field list, has nothing new to copy and can be skipped.
+    """
+
+    def __init__(self, path: str, dest_id: str, signature: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS synced ("
+            "dest TEXT NOT NULL, rating_key INTEGER NOT NULL, src_updated INTEGER NOT NULL, "
+            "signature TEXT NOT NULL, PRIMARY KEY (dest, rating_key))"
+        )
+        self.dest_id = dest_id
+        self.signature = signature
+        rows = self.conn.execute(
+            "SELECT rating_key, src_updated FROM synced WHERE dest = ? AND signature = ?",
+            (dest_id, signature),
+        )
+        self.seen: Dict[int, int] = dict(rows)
+        self.pending: List[Tuple[str, int, int, str]] = []
+
+    def unchanged(self, rk: int, src_updated: int) -> bool:
+        last = self.seen.get(rk)
+        return last is not None and src_updated > 0 and src_updated <= last
+
+    def record(self, rk: int, src_updated: int) -> None:
+        if src_updated > 0:
+            self.pending.append((self.dest_id, rk, src_updated, self.signature))
+            if len(self.pending) >= _SYNC_COMMIT_EVERY:
+                self.flush()
+
+    def flush(self) -> None:
+        """Commit the items recorded so far, so an interrupted run keeps them."""
+        if not self.pending:
+            return
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO synced (dest, rating_key, src_updated, signature) VALUES (?, ?, ?, ?)",
+                    self.pending,
+                )
+        except sqlite3.Error as ex:
+            eprint(f"Warning: could not save sync state {SYNC_STATE_PATH}: {ex}")
+        self.pending = []
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+
+def _open_sync_state(dest: PlexServer, fields: List[str], lock_fields: bool, artwork: bool) -> Optional[SyncState]:
+    signature = ",".join(sorted(fields)) + (";lock" if lock_fields else "") + (";artwork" if artwork else "")
+    try:
+        return SyncState(SYNC_STATE_PATH, dest.machineIdentifier, signature)
+    except (OSError, sqlite3.Error) as ex:
+        eprint(f"Warning: could not open sync state {SYNC_STATE_PATH}, checking every item: {ex}")
+        return None
+
+
+ARTWORK_TOKENS_PATH = os.path.join(CACHE_DIR, "artwork_hashes.json")
+
+
+def _image_token(path: Optional[str]) -> str:
+    """Trailing token of a Plex image path, /library/metadata/<rk>/thumb/<token>, which changes with the image."""
+    return (path or "").rstrip("/").rsplit("/", 1)[-1]
+
+
+def _fetch_image(server: PlexServer, path: str) -> bytes:
+    buf = io.BytesIO()
+    with server._session.get(server.url(path, includeToken=True), stream=True) as r:
+        r.raise_for_status()
+        for chunk in r.iter_content(1024 * 64):
+            buf.write(chunk)
+    return buf.getvalue()
+
+
+def _copy_image(
+    src_server: PlexServer,
+    path: str,
+    dest_item,
+    dest_path: Optional[str],
+    upload,
+    label: str,
+    debug: bool = False,
+    tokens: Optional[Dict[str, str]] = None,
+) -> bool:
+    """Copy one image in memory, skipping the upload when the destination already has the same bytes.
+
+    With tokens, the source image token copied last time for this destination
+    item is remembered, and an unchanged token skips the download as well.
+    Returns False if the image could not be copied.
+    """
+    tok = _image_token(path)
+    key = f"{dest_item._server.machineIdentifier}:{rating_key(dest_item)}:{label.lower()}"
+    if tokens is not None and tok and tokens.get(key) == tok:
+        if debug:
+            eprint(f"  {label} unchanged since last run")
+        return True
+    try:
+        data = _fetch_image(src_server, path)
+        copied = True
+        if dest_path:
+            try:
+                if _fetch_image(dest_item._server, dest_path) == data:
+                    copied = False
+            except Exception:
+                pass
+        if copied:
+            upload(filepath=data)
+        if debug:
+            eprint(f"  {label} {'copied' if copied else 'unchanged'}")
+        if tokens is not None and tok:
+            tokens[key] = tok
+        return True
     except Exception as ex:
-        eprint(f"  Warning: failed to copy poster: {ex}")
-    # Background art
+        eprint(f"  Warning: failed to copy {label.lower()}: {ex}")
+        return False
+
+
+def _copy_poster(src_server: PlexServer, src_item, dest_item, debug: bool = False, tokens: Optional[Dict[str, str]] = None) -> bool:
+    if not getattr(src_item, "thumb", None):
+        return True
+    return _copy_image(src_server, src_item.thumb, dest_item, getattr(dest_item, "thumb", None), dest_item.uploadPoster, "Poster", debug=debug, tokens=tokens)
+
+
+def _copy_art(src_server: PlexServer, src_item, dest_item, debug: bool = False, tokens: Optional[Dict[str, str]] = None) -> bool:
+    if not getattr(src_item, "art", None):
+        return True
+    return _copy_image(src_server, src_item.art, dest_item, getattr(dest_item, "art", None), dest_item.uploadArt, "Art", debug=debug, tokens=tokens)
+
+
+def _artwork_done(fut) -> bool:
+    """Result of an artwork job, an unexpected error is reported and counts as a failure."""
     try:
-        if getattr(src_item, "art", None):
-            url = src_server.url(src_item.art)
-            with src_server._session.get(url, stream=True) as r:
-                r.raise_for_status()
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as fp:
-                    for chunk in r.iter_content(1024 * 64):
-                        fp.write(chunk)
-                    tmp = fp.name
-            dest_item.uploadArt(tmp)
-            if debug:
-                eprint("  Art copied")
+        return bool(fut.result())
     except Exception as ex:
-        eprint(f"  Warning: failed to copy art: {ex}")
+        eprint(f"  Warning: artwork copy failed: {ex}")
+        return False
 
 
 def sync_metadata(
@@ -443,49 +1065,117 @@ def sync_metadata(
     fields: List[str],
     artwork: bool,
     lock_fields: bool,
-    include: Optional[str],
-    exclude: Optional[str],
+    include_re: Optional[re.Pattern],
+    exclude_re: Optional[re.Pattern],
     debug: bool,
     dry_run: bool,
+    index_workers: int = 0,
+    artwork_workers: int = 8,
+    artwork_cache: bool = True,
+    idx: Optional[DestIndex] = None,
+    force: bool = False,
+    src_sections: Optional[List[object]] = None,
+    dest_sections: Optional[List[object]] = None,
 ):
-    include_re = re.compile(include) if include else None
-    exclude_re = re.compile(exclude) if exclude else None
+    if idx is None or not idx.keep_items:
+        idx = build_destination_index(dest, debug=debug, workers=index_workers, keep_items=True, sections=dest_sections)
+    sections = src_sections if src_sections is not None else media_sections(src)
+
+    # Source image tokens copied on earlier runs, keyed by destination item
+    tokens = _load_json(ARTWORK_TOKENS_PATH) if artwork and artwork_cache and not dry_run else None
+    # Source updatedAt of each item at its last sync, so untouched items skip the diff.
+    # A dry run neither reads nor writes it.
+    state = None if force or dry_run else _open_sync_state(dest, fields, lock_fields, artwork)
 
-    idx = build_destination_index(dest, debug=debug)
-    sections = [s for s in src.library.sections() if s.TYPE.lower() in ("movie", "show")]
+    include_search = include_re.search if include_re else None
+    exclude_search = exclude_re.search if exclude_re else None
 
     changed = 0
     scanned = 0
-    for s in sections:
-        eprint(f"Scanning source section '{s.title}' for metadata sync...")
-        items = s.all() if s.TYPE.lower() == "movie" else s.all()
-        for it in items:
-            scanned += 1
-            title = getattr(it, "title", "<untitled>")
-            if include_re and not include_re.search(title):
-                continue
-            if exclude_re and exclude_re.search(title):
-                continue
-            # match
-            matched = None
-            for gid in [g.lower() for g in collect_guids(it)]:
-                matched = idx.by_guid.get(gid)
-                if matched:
-                    break
-            if matched is None:
-                continue
-            diffs = _diff_fields(it, matched, fields)
-            if diffs and debug:
-                eprint(f"'{title}': diffs -> {list(diffs.keys())}")
-            if dry_run:
-                continue
-            if diffs:
-                values = {k: v[0] for k, v in diffs.items()}
-                _apply_fields(matched, values, lock=lock_fields, debug=debug)
-                changed += 1
-            if artwork:
-                _copy_artwork(src, it, matched, debug=debug)
-    eprint(f"Metadata sync complete. Scanned {scanned} items. Updated {changed}.")
+    unchanged = 0
+    art_failed = 0
+    # Artwork transfers are independent per image, so they run on a pool while
+    # the loop carries on with field edits. Jobs are checked oldest first, and
+    # the loop waits once too many are in flight so the queue stays small. An
+    # item is recorded as synced only once its fields and artwork all went through.
+    art_limit = max(1, artwork_workers) * 4
+    art_pending = deque()
+
+    def drain(limit: int) -> None:
+        nonlocal art_failed
+        while len(art_pending) > limit:
+            rk, src_updated, synced, futs = art_pending.popleft()
+            if not all([_artwork_done(f) for f in futs]):
+                art_failed += 1
+            elif state is not None and synced:
+                state.record(rk, src_updated)
+
+    # Whatever was synced is saved even if the loop stops early, on Ctrl-C or an error
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, artwork_workers), initializer=_set_phase, initargs=(_current_phase(),)) as art_pool:
+            try:
+                for s in sections:
+                    if _STOP.is_set():
+                        break
+                    eprint(f"Scanning source section '{s.title}' for metadata sync...")
+                    items = s.all(container_size=CONTAINER_SIZE)
+                    for it in items:
+                        if _STOP.is_set():
+                            break
+                        scanned += 1
+                        title = getattr(it, "title", "<untitled>")
+                        if include_search and not include_search(title):
+                            continue
+                        if exclude_search and exclude_search(title):
+                            continue
+                        # match
+                        matched = None
+                        for gid in collect_guids(it):
+                            rk = idx.by_guid.get(gid)
+                            if rk:
+                                matched = idx.items.get(rk)
+                                break
+                        if matched is None:
+                            continue
+                        src_updated = _timestamp(getattr(it, "updatedAt", None))
+                        if state is not None and state.unchanged(rk, src_updated):
+                            unchanged += 1
+                            continue
+                        diffs = _diff_fields(it, matched, fields)
+                        if diffs and debug:
+                            eprint(f"'{title}': diffs -> {list(diffs.keys())}")
+                        if dry_run:
+                            continue
+                        synced = True
+                        if diffs:
+                            values = {k: v[0] for k, v in diffs.items()}
+                            synced = _apply_fields(matched, values, lock=lock_fields, debug=debug)
+                            changed += 1
+                        if artwork:
+                            futs = (
+                                art_pool.submit(_copy_poster, src, it, matched, debug, tokens),
+                                art_pool.submit(_copy_art, src, it, matched, debug, tokens),
+                            )
+                            art_pending.append((rk, src_updated, synced, futs))
+                            drain(art_limit)
+                        elif state is not None and synced:
+                            state.record(rk, src_updated)
+            finally:
+                drain(0)
+    finally:
+        if tokens is not None:
+            _save_json(ARTWORK_TOKENS_PATH, tokens)
+        if state is not None:
+            try:
+                state.close()
+            except sqlite3.Error as ex:
+                eprint(f"Warning: could not save sync state {SYNC_STATE_PATH}: {ex}")
+    eprint(
+        f"Metadata sync complete. Scanned {scanned} items. Updated {changed}. "
+        f"Skipped {unchanged} unchanged since the last sync."
+    )
+    if art_failed:
+        eprint(f"Warning: artwork could not be copied for {art_failed} items.")
 
 
 # ------------------------------ Playlists ------------------------------
@@ -493,25 +1183,30 @@ def sync_metadata(
 def migrate_playlists(
     src: PlexServer,
     dest: PlexServer,
-    include: Optional[str],
-    exclude: Optional[str],
+    include_re: Optional[re.Pattern],
+    exclude_re: Optional[re.Pattern],
     materialize_smart: bool,
     rename_template: str,
     replace: bool,
     batch_size: int,
     debug: bool,
     dry_run: bool,
+    index_workers: int = 0,
+    idx: Optional[DestIndex] = None,
 ):
     playlists = src.playlists()
     eprint(f"Found {len(playlists)} playlists on source")
 
-    include_re = re.compile(include) if include else None
-    exclude_re = re.compile(exclude) if exclude else None
-
-    idx = build_destination_index(dest, debug=debug)
+    if idx is None:
+        idx = build_destination_index(dest, debug=debug, workers=index_workers)
+    match_cache: Dict[object, Tuple[Optional[int], List[str]]] = {}
+    # Destination playlists by title, listed before the first create
+    existing_by_name: Optional[Dict[str, object]] = None
 
     migrated = 0
     for pl in playlists:
+        if _STOP.is_set():
+            break
         try:
             name = pl.title
             ptype = getattr(pl, "playlistType", None) or getattr(pl, "smartType", None) or ""
@@ -535,7 +1230,7 @@ def migrate_playlists(
             if debug:
                 eprint(f"Playlist '{name}': {len(src_items)} items")
 
-            dest_items: List[object] = []
+            dest_items: List[int] = []
             missing = []
             seen_rk = set()
             for it in src_items:
@@ -544,12 +1239,7 @@ def migrate_playlists(
                     continue
                 if rk_src is not None:
                     seen_rk.add(rk_src)
-                guids = [g.lower() for g in collect_guids(it)]
-                matched = None
-                for gid in guids:
-                    matched = idx.by_guid.get(gid)
-                    if matched:
-                        break
+                matched, guids = match_item(idx, it, match_cache)
                 if matched is not None:
                     dest_items.append(matched)
                 else:
@@ -563,9 +1253,8 @@ def migrate_playlists(
 
             dest_keys: List[int] = []
             seen_keys = set()
-            for it in dest_items:
-                rk = rating_key(it)
-                if rk is not None and rk not in seen_keys:
+            for rk in dest_items:
+                if rk not in seen_keys:
                     dest_keys.append(rk)
                     seen_keys.add(rk)
 
@@ -582,7 +1271,17 @@ def migrate_playlists(
                 continue
 
             dest_name = rename_template.format(name=name)
-            create_playlist_with_batches(dest, dest_name, dest_keys, replace=replace, batch_size=batch_size, debug=debug)
+            if existing_by_name is None:
+                existing_by_name = _playlists_by_name(dest)
+            create_playlist_with_batches(
+                dest,
+                dest_name,
+                dest_keys,
+                replace=replace,
+                batch_size=batch_size,
+                debug=debug,
+                existing_by_name=existing_by_name,
+            )
             eprint(f"Created '{dest_name}' with {len(dest_items)} items. Missed {len(missing)}.")
             migrated += 1
         except Exception as ex:
@@ -620,6 +1319,10 @@ def _run_self_tests() -> None:
             m = _FakeMedia(rk)
             self.fetched[rk] = m
             return m
+        def fetchItems(self, path: str):
+            # Plex does not promise to return batched keys in request order
+            keys = [int(k) for k in path.rsplit("/", 1)[-1].split(",")]
+            return [self.fetchItem(f"/library/metadata/{k}") for k in reversed(keys) if k != 404]
 
     # rating_key helper
     fm = _FakeMedia(42)
@@ -632,6 +1335,68 @@ def _run_self_tests() -> None:
     fp = _FakePlex()
     res = _coerce_to_media(fp, [1, "2", _FakeMedia(3)])
     assert [rating_key(x) for x in res] == [1, 2, 3]
+    # batched fetch keeps input order, a key missing from the batch is retried on its own
+    res = _coerce_to_media(fp, [5, _FakeMedia(6), "7", 404, 8])
+    assert [rating_key(x) for x in res] == [5, 6, 7, 404, 8]
+
+    # DestIndex keeps ratingKeys keyed by lowercased GUID
+    class _Guid:
+        def __init__(self, gid: str):
+            self.id = gid
+    gm = _FakeMedia(5)
+    gm.guids = [_Guid("IMDB://tt0001 ")]
+    di = DestIndex()
+    di.add_item(gm)
+    assert di.by_guid == {"imdb://tt0001": 5} and not di.items
+
+    # match_item finds the destination key and memoizes it by source ratingKey
+    cache = {}
+    sm = _FakeMedia(9)
+    sm.guids = [_Guid("imdb://tt0001")]
+    assert match_item(di, sm, cache) == (5, ["imdb://tt0001"])
+    sm.guids = []
+    assert match_item(di, sm, cache)[0] == 5
+
+    # _remove_collection clears members of a listed collection once
+    class _Coll:
+        def __init__(self, members):
+            self._members = members
+        def items(self):
+            return self._members
+    class _Member:
+        def __init__(self):
+            self.removed = []
+        def removeCollection(self, name):
+            self.removed.append(name)
+    mem = _Member()
+    listed = {"Faves": [_Coll([mem])]}
+    assert _remove_collection("Faves", listed) == 1 and mem.removed == ["Faves"] and not listed
+
+    # _batch_collection_edit removes from items of one section in a single batch
+    class _Section:
+        def __init__(self):
+            self.saved = []
+        def batchMultiEdits(self, items):
+            self._batch = items
+        def removeCollection(self, name):
+            self._name = name
+        def saveMultiEdits(self):
+            self.saved.append((self._name, [rating_key(x) for x in self._batch]))
+    sec = _Section()
+    batched = [_Member() for _ in range(2)]
+    for rk, bm in enumerate(batched, 1):
+        bm.ratingKey, bm.librarySectionID, bm.type, bm.section = rk, 1, "movie", (lambda: sec)
+    assert _batch_collection_edit(batched, "Faves", remove=True) == [] and sec.saved == [("Faves", [1, 2])]
+
+    # _add_collection_to_items edits each item, never the section
+    class _Adder(_Member):
+        def addCollection(self, name):
+            self.added = name
+    adders = [_Adder() for _ in range(2)]
+    for ad in adders:
+        ad.librarySectionID, ad.type, ad.section = 1, "movie", (lambda: sec)
+    assert _add_collection_to_items("Faves", adders) == 2 and all(ad.added == "Faves" for ad in adders)
+    assert len(sec.saved) == 1
 
     # _diff_fields and _apply_fields
     src = _FakeMedia(1)
@@ -639,6 +1404,9 @@ def _run_self_tests() -> None:
     src.summary = "New summary"
     diffs = _diff_fields(src, dest, ["summary"])  # should detect difference
     assert "summary" in diffs
+    assert _diff_fields(src, dest, ["tagline", "titleSort"]) == {}
+    dest.tagline = " B "
+    assert _diff_fields(src, dest, ["summary", "tagline", "missing"]) == {"summary": ("New summary", "A")}
     _apply_fields(dest, {"summary": src.summary}, lock=True)
     assert dest.summary == "New summary" and getattr(dest, "locked_summary", False) is True
 
@@ -655,6 +1423,20 @@ def _run_self_tests() -> None:
 
 # ------------------------------ CLI ------------------------------
 
+def _run_phase(name: Optional[str], fn, kwargs: Dict[str, object]):
+    """Run one migration phase on a pool thread, tagging its output with name."""
+    _set_phase(name)
+    try:
+        return fn(**kwargs)
+    finally:
+        _set_phase(None)
+
+
+def _compile_filter(pattern: Optional[str]) -> Optional[re.Pattern]:
+    """Compile a --include/--exclude style filter once, case insensitive."""
+    return re.compile(pattern, re.IGNORECASE) if pattern else None
+
+
 def main():
     load_dotenv()
 
@@ -681,6 +1463,9 @@ def main():
     p.add_argument("--sync-metadata", action="store_true", help="Sync metadata fields from source to destination")
     p.add_argument("--fields", default=",".join(SYNCABLE_FIELDS), help=f"Comma list of fields to sync. Default: {','.join(SYNCABLE_FIELDS)}")
     p.add_argument("--artwork", action="store_true", help="Also copy poster and background art from source to destination")
+    p.add_argument("--artwork-workers", type=int, default=8, help="Parallel artwork transfers with --artwork. Default: 8")
+    p.add_argument("--force", action="store_true", help="Diff every item in metadata sync, even ones whose source is unchanged since the last sync")
+    p.add_argument("--no-artwork-cache", action="store_true", help="Ignore artwork copied on earlier runs and compare every image again")
     p.add_argument("--lock-fields", action="store_true", help="Lock fields after editing to preserve values against agent refreshes")
     p.add_argument("--meta-include", help="Regex on title, only items whose title matches will be synced")
     p.add_argument("--meta-exclude", help="Regex on title, items whose title matches will be skipped")
@@ -688,6 +1473,9 @@ def main():
     # General
     p.add_argument("--replace", action="store_true", help="Replace destination playlist if it exists and clear collection before re adding")
     p.add_argument("--batch-size", type=int, default=100, help="Items are added to playlists in batches of this size")
+    p.add_argument("--cache-index", action="store_true", help="Save the destination GUID index on disk and reuse it while the destination libraries are unchanged. Ignored with --sync-metadata, which needs the live items")
+    p.add_argument("--slow-index", action="store_true", help="Index show libraries show by show instead of one bulk episode listing per library")
+    p.add_argument("--index-workers", type=int, default=default_index_workers(), help="Parallel requests used to index the destination library")
     p.add_argument("--dry-run", action="store_true")
     p.add_argument("--debug", action="store_true")
     p.add_argument("--self-test", action="store_true", help="Run internal tests and exit")
@@ -706,54 +1494,119 @@ def main():
         eprint("Error: Destination URL and token are required. Use --dest-url and --dest-token or set DEST_PLEX_URL and DEST_PLEX_TOKEN.")
         sys.exit(2)
 
+    # Compile the filters before connecting, so a bad pattern fails fast
+    try:
+        filters = {
+            name: _compile_filter(getattr(args, name))
+            for name in ("include", "exclude", "collection_include", "collection_exclude", "meta_include", "meta_exclude")
+        }
+    except re.error as ex:
+        eprint(f"Error: invalid filter regex: {ex}")
+        sys.exit(2)
+
+    session = build_session(args.insecure)
+
     eprint("Connecting to source Plex...")
-    src = connect_plex(args.source_url, args.source_token, args.insecure)
+    src = connect_plex(args.source_url, args.source_token, args.insecure, session=session)
 
     eprint("Connecting to destination Plex...")
-    dest = connect_plex(args.dest_url, args.dest_token, args.insecure)
+    dest = connect_plex(args.dest_url, args.dest_token, args.insecure, session=session)
+
+    # Library sections are listed once per server and shared by every phase
+    src_sections = media_sections(src) if args.collections or args.sync_metadata else None
+    dest_sections = media_sections(dest)
+
+    # Index the destination once for every phase. Metadata sync reads fields
+    # off the destination items, so it needs the objects kept.
+    if args.cache_index and args.sync_metadata:
+        eprint("Warning: --cache-index is ignored with --sync-metadata, the destination is indexed in full.")
+    idx = None
+    if not args.no_playlists or args.collections or args.sync_metadata:
+        idx = build_destination_index(
+            dest,
+            debug=args.debug,
+            workers=args.index_workers,
+            keep_items=args.sync_metadata,
+            cache=args.cache_index,
+            slow=args.slow_index,
+            sections=dest_sections,
+        )
+
+    jobs = []
 
     # Playlists
     if not args.no_playlists:
-        migrate_playlists(
+        jobs.append(("playlists", migrate_playlists, dict(
             src=src,
             dest=dest,
-            include=args.include,
-            exclude=args.exclude,
+            include_re=filters["include"],
+            exclude_re=filters["exclude"],
             materialize_smart=args.materialize_smart,
             rename_template=args.rename_template,
             replace=args.replace,
             batch_size=args.batch_size,
             debug=args.debug,
             dry_run=args.dry_run,
-        )
+            index_workers=args.index_workers,
+            idx=idx,
+        )))
 
     # Collections
     if args.collections:
-        migrate_collections(
+        jobs.append(("collections", migrate_collections, dict(
             src=src,
             dest=dest,
-            include=args.collection_include,
-            exclude=args.collection_exclude,
+            include_re=filters["collection_include"],
+            exclude_re=filters["collection_exclude"],
             rename_template=args.collection_rename_template,
             replace=args.replace,
             debug=args.debug,
             dry_run=args.dry_run,
-        )
+            index_workers=args.index_workers,
+            idx=idx,
+            src_sections=src_sections,
+            dest_sections=dest_sections,
+        )))
 
     # Metadata sync
     if args.sync_metadata:
         field_list = [f.strip() for f in (args.fields or "").split(",") if f.strip()]
-        sync_metadata(
+        jobs.append(("metadata", sync_metadata, dict(
             src=src,
             dest=dest,
             fields=field_list,
             artwork=args.artwork,
             lock_fields=args.lock_fields,
-            include=args.meta_include,
-            exclude=args.meta_exclude,
+            include_re=filters["meta_include"],
+            exclude_re=filters["meta_exclude"],
             debug=args.debug,
             dry_run=args.dry_run,
-        )
+            index_workers=args.index_workers,
+            idx=idx,
+            artwork_workers=args.artwork_workers,
+            artwork_cache=not args.no_artwork_cache,
+            force=args.force,
+            src_sections=src_sections,
+            dest_sections=dest_sections,
+        )))
+
+    # The phases only share the read-only index and touch different things on
+    # the destination, so they run side by side, each line tagged with its phase.
+    # A failure is raised once the others have finished. On Ctrl-C the phases
+    # stop at their next item and queued ones never start.
+    tag = len(jobs) > 1
+    phases = ThreadPoolExecutor(max_workers=max(1, len(jobs)))
+    futures = [phases.submit(_run_phase, name if tag else None, fn, kwargs) for name, fn, kwargs in jobs]
+    try:
+        for future in as_completed(futures):
+            future.result()
+    except KeyboardInterrupt:
+        _STOP.set()
+        for future in futures:
+            future.cancel()
+        raise
+    finally:
+        phases.shutdown(wait=not _STOP.is_set())
 
 
 if __name__ == "__main__":